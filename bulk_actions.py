@@ -0,0 +1,17 @@
+# bulk_actions.py
+import streamlit as st
+
+
+def select_orders(orders, key, label="Select orders"):
+    """Show a multi-select over a work queue and return the selected orders."""
+    if st.checkbox(f"Select all {len(orders)} orders", key=f"{key}_all"):
+        return list(orders)
+
+    by_id = {order.order_id: order for order in orders}
+    selected_ids = st.multiselect(
+        label,
+        list(by_id),
+        format_func=lambda order_id: f"#{order_id[:8]} - {by_id[order_id].company_name}",
+        key=f"{key}_selected"
+    )
+    return [by_id[order_id] for order_id in selected_ids if order_id in by_id]
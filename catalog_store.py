@@ -0,0 +1,194 @@
+# catalog_store.py
+import hashlib
+import io
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from image_store import get_image_store
+from indexes import RankedIndex
+
+logger = logging.getLogger(__name__)
+
+# Product catalog file; override with SEED_SALES_CATALOG
+CATALOG_PATH = os.environ.get(
+    'SEED_SALES_CATALOG',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'catalog.csv')
+)
+
+# Column types, so a price edited to "20" still loads as a float
+CATALOG_COLUMNS = {
+    'SeedId': str,
+    'Seed': str,
+    'Description': str,
+    'Price': float,
+    'Min_Order': int,
+    'Germination_Rate': int,
+    'Maturity_Period': str,
+    'Image': str,
+}
+
+# "Sort by" options on the catalog pages: (column, ascending)
+SORT_OPTIONS = {
+    "Price: Low to High": ('Price', True),
+    "Price: High to Low": ('Price', False),
+    "Germination Rate": ('Germination_Rate', False),
+}
+
+# Searchable columns and how much a match in each counts
+SEARCH_FIELDS = {
+    'Seed': 3,
+    'Description': 1,
+    'Maturity_Period': 1,
+}
+
+# Filtered, sorted product lists kept per catalog version
+SELECTION_CACHE_SIZE = 256
+
+
+class Catalog:
+    """One loaded version of the catalog file.
+
+    The row order for every "Sort by" option is computed once on load, so a
+    page view only masks the prices in that order and takes the matching rows.
+    Results are memoized by (price range, sort option, search term). A ranked
+    search index over SEARCH_FIELDS is built on load as well. `products` and
+    the returned product dicts are shared by every session, so treat them as
+    read-only.
+    """
+
+    def __init__(self, products, digest):
+        self.products = products
+        self.digest = digest
+        self.max_price = float(products['Price'].max()) if len(products) else 0.0
+        self._prices = products['Price'].to_numpy()
+        self._records = products.to_dict('records')
+        self._by_id = {record['SeedId']: index for index, record in enumerate(self._records)}
+        self.search_index = RankedIndex()
+        for record in self._records:
+            self.search_index.add(record['SeedId'], [(record[column], weight) for column, weight in SEARCH_FIELDS.items()])
+        self._orders = {
+            option: np.argsort(
+                products[column].to_numpy() if ascending else -products[column].to_numpy(),
+                kind='stable'
+            )
+            for option, (column, ascending) in SORT_OPTIONS.items()
+        }
+        self._selections = {}
+
+    def __len__(self):
+        return len(self.products)
+
+    def search(self, term, limit=None):
+        """Return the SeedIds of products matching a search term, best match first."""
+        return self.search_index.search(term, limit)
+
+    def get(self, seed_id):
+        """Return the product with a SeedId, or None."""
+        index = self._by_id.get(seed_id)
+        return None if index is None else self._records[index]
+
+    def select(self, price_range, sort_by, term=''):
+        """Return the products priced within `price_range`, ordered by a SORT_OPTIONS key.
+
+        With a search term, only matching products are returned, best match first.
+        """
+        term = term.strip().lower()
+        key = (tuple(price_range), sort_by, term)
+        selection = self._selections.get(key)
+        if selection is None:
+            low, high = price_range
+            if term:
+                order = np.array([self._by_id[seed_id] for seed_id in self.search(term)], dtype=np.intp)
+            else:
+                order = self._orders[sort_by]
+            prices = self._prices[order]
+            rows = order[(prices >= low) & (prices <= high)]
+            selection = [self._records[row] for row in rows]
+            if len(self._selections) >= SELECTION_CACHE_SIZE:
+                self._selections.clear()
+            self._selections[key] = selection
+        return selection
+
+
+class CatalogStore:
+    """Loads the catalog file and keeps the parsed catalog until the file changes.
+
+    Each call to catalog() only stats the file. When its modification time or
+    size changes the file is read and hashed, and parsed again only if the
+    contents differ, so edits such as new prices are picked up without a restart.
+    A file that is missing or fails to parse, for instance while it is being
+    saved, is logged and the last good catalog is kept (an empty one if none
+    has loaded yet) until the file changes again. `on_load` is called with
+    each new version of the catalog once it has loaded.
+    """
+
+    def __init__(self, path=CATALOG_PATH, on_load=None):
+        self.path = path
+        self.on_load = on_load
+        self._lock = threading.Lock()
+        self._stat = None
+        self._catalog = None
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def catalog(self):
+        """Return the current catalog, reloading it if the file changed."""
+        stat = self._file_stat()
+        if stat == self._stat and self._catalog is not None:
+            return self._catalog
+
+        with self._lock:
+            if stat != self._stat or self._catalog is None:
+                # Whether or not the load works, wait for the next change before trying again
+                self._stat = stat
+                try:
+                    self._load()
+                except (OSError, ValueError) as e:
+                    logger.warning("Could not load catalog %s, keeping the last good one: %s", self.path, e)
+                    if self._catalog is None:
+                        self._catalog = Catalog(self._empty(), None)
+            return self._catalog
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if self._catalog is None or digest != self._catalog.digest:
+            self._catalog = Catalog(self._parse(data), digest)
+            if self.on_load is not None:
+                self.on_load(self._catalog)
+
+    def _parse(self, data):
+        products = pd.read_csv(io.BytesIO(data), dtype=CATALOG_COLUMNS, keep_default_na=False)
+        missing = set(CATALOG_COLUMNS) - set(products.columns)
+        if missing:
+            raise ValueError(f"Catalog file {self.path} is missing columns: {', '.join(sorted(missing))}")
+        return products[list(CATALOG_COLUMNS)]
+
+    def _empty(self):
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in CATALOG_COLUMNS.items()})
+
+
+@st.cache_resource
+def get_catalog_store():
+    """Return the catalog store shared by all sessions in this server process.
+
+    Product images of each catalog version start loading in the background as
+    soon as it loads, so the pages find their thumbnails ready.
+    """
+    return CatalogStore(on_load=lambda catalog: get_image_store().warm(catalog.products['Image']))
+
+
+def get_catalog():
+    """Return the current catalog."""
+    return get_catalog_store().catalog()
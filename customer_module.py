@@ -1,11 +1,18 @@
 # customer_module.py
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as day_time
 import uuid
+import math
 import re
 import time
-from notification import create_notification, show_notifications_customer
+from notification import create_notification, create_notifications, mark_seen, show_notifications_customer, transition_orders
+from order_store import OrderConflictError, get_order_store
+from order_workflow import ORDER_STATUS, can_transition, notifications_for
+from models import CartItem, Order, format_timestamp
+from catalog_store import SORT_OPTIONS, get_catalog
+from image_store import get_image_store
+from inbox import Inbox
+from pagination import page_window
 
 
 st.markdown("""
@@ -27,31 +34,22 @@ st.markdown("""
     }
 """, unsafe_allow_html=True)
 
-# Add new order status constants for clarity
-ORDER_STATUS = {
-    'PENDING_PRODUCTION': 'pending_production',
-    'PENDING_PAYMENT_TERM': 'pending_payment_term',
-    'PENDING_MARKETING': 'pending_marketing_approval',
-    'PAYMENT_TERM_REJECTED': 'payment_term_rejected',
-    'PENDING_PAYMENT': 'pending_payment',
-    'PROCESSING_PAYMENT': 'processing_payment',
-    'PAYMENT_VERIFIED': 'payment_verified',
-    'DO_GENERATED': 'do_generated',
-    'DO_APPROVED': 'do_approved',
-    'READY_FOR_PICKUP': 'ready_for_pickup',
-    'COMPLETED': 'completed'
-}
+# Statuses where the customer works on payment terms
+PAYMENT_TERM_STATUSES = (
+    ORDER_STATUS['PENDING_PAYMENT_TERM'],
+    ORDER_STATUS['PENDING_PAYMENT_APPROVAL'],
+    ORDER_STATUS['PAYMENT_TERMS_APPROVED'],
+    ORDER_STATUS['PAYMENT_TERMS_REJECTED']
+)
 
 def initialize_session_state():
     """Initialize all required session state variables"""
     if 'cart' not in st.session_state:
         st.session_state.cart = []
     if 'notification_customer' not in st.session_state:
-        st.session_state.notification_customer = []
+        st.session_state.notification_customer = Inbox()
     if 'production_notifications' not in st.session_state:
-        st.session_state.production_notifications = []
-    if 'orders' not in st.session_state:
-        st.session_state.orders = []
+        st.session_state.production_notifications = Inbox()
     if 'order_updated' not in st.session_state:
         st.session_state.order_updated = False
     if 'chat_history' not in st.session_state:
@@ -63,12 +61,12 @@ def show_payment_section(order):
     st.markdown("### 💳 Payment Processing")
     
     # Get payment details
-    details = order.get('payment_details', {})
-    payment_term = order.get('payment_term')
+    details = order.payment_details or {}
+    payment_term = order.payment_term
     
     # Calculate amount to pay upfront to avoid errors
     if payment_term == 'Prepayment':
-        amount_to_pay = details.get('discounted_amount', order['total'] * 0.95)
+        amount_to_pay = details.get('discounted_amount', order.total * 0.95)
     else:
         if details.get('payment_schedule'):
             current_date = datetime.now().date()
@@ -78,10 +76,10 @@ def show_payment_section(order):
                 if current_date >= installment['due_date']
             )
         else:
-            amount_to_pay = details.get('total_with_interest', order['total'])
+            amount_to_pay = details.get('total_with_interest', order.total)
     
-    # Only show payment form if payment terms are approved
-    if order.get('status') != 'payment_terms_approved':
+    # Only show payment form once the workflow allows a payment
+    if not can_transition(order.status, 'PaymentSubmitted'):
         st.warning("Please wait for payment terms approval before proceeding with payment.")
         return
     
@@ -91,7 +89,7 @@ def show_payment_section(order):
         st.write("**Payment Summary**")
         
         if payment_term == 'Prepayment':
-            st.write(f"Original Amount: ${order['total']:.2f}")
+            st.write(f"Original Amount: ${order.total:.2f}")
             st.write("Discount Applied: 5%")
             st.write(f"Final Amount to Pay: ${amount_to_pay:.2f}")
         else:
@@ -124,17 +122,17 @@ def show_payment_section(order):
         "Select Payment Method",
         options=list(payment_methods.keys()),
         format_func=lambda x: payment_methods[x],
-        key="payment_method_select"
+        key=f"payment_method_select_{order.order_id}"
     )
     
     # Display payment fields based on method
     if payment_method == 'credit_card':
-        st.text_input("Card Number", placeholder="XXXX-XXXX-XXXX-XXXX")
+        st.text_input("Card Number", placeholder="XXXX-XXXX-XXXX-XXXX", key=f"card_number_{order.order_id}")
         col1, col2 = st.columns(2)
         with col1:
-            st.text_input("Expiry Date", placeholder="MM/YY")
+            st.text_input("Expiry Date", placeholder="MM/YY", key=f"card_expiry_{order.order_id}")
         with col2:
-            st.text_input("CVV", placeholder="123", type="password")
+            st.text_input("CVV", placeholder="123", type="password", key=f"card_cvv_{order.order_id}")
             
     elif payment_method == 'bank_transfer':
         st.info(f"""
@@ -142,52 +140,33 @@ def show_payment_section(order):
         - Bank: Example Bank
         - Account Name: Palm Oil Seeds Co.
         - Account Number: 1234-5678-9012
-        - Reference: Order #{order['order_id'][:8]}
+        - Reference: Order #{order.order_id[:8]}
         - Amount to Transfer: ${amount_to_pay:.2f}
         """)
-        st.file_uploader("Upload Payment Receipt", type=['pdf', 'jpg', 'png'])
+        st.file_uploader("Upload Payment Receipt", type=['pdf', 'jpg', 'png'], key=f"payment_receipt_{order.order_id}")
         
     elif payment_method == 'cheque':
         st.write(f"Amount to Pay: ${amount_to_pay:.2f}")
-        st.text_input("Cheque Number")
-        st.file_uploader("Upload Cheque Image", type=['jpg', 'png'])
+        st.text_input("Cheque Number", key=f"cheque_number_{order.order_id}")
+        st.file_uploader("Upload Cheque Image", type=['jpg', 'png'], key=f"cheque_image_{order.order_id}")
     
     # Submit payment button
-    if st.button("Submit Payment", key="submit_payment_button"):
-        # Update order status and payment details
-        for idx, o in enumerate(st.session_state.orders):
-            if o['order_id'] == order['order_id']:
-                st.session_state.orders[idx]['status'] = 'payment_submitted'
-                st.session_state.orders[idx]['payment_status'] = 'pending_verification'
-                st.session_state.orders[idx]['payment_method'] = payment_method
-                st.session_state.orders[idx]['payment_timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                st.session_state.orders[idx]['payment_amount'] = amount_to_pay
-                
-                # Add tracking update
-                st.session_state.orders[idx]['tracking_updates'].append({
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    'status': 'Payment Submitted',
-                    'message': f'Payment of ${amount_to_pay:.2f} submitted via {payment_methods[payment_method]}'
-                })
-        
-        # Create notifications
-        create_notification(
-            order_id=order['order_id'],
-            notification_type='payment',
-            title='Payment Submitted',
-            message=f'Payment of ${amount_to_pay:.2f} for order #{order["order_id"][:8]} has been submitted and is being processed.',
-            priority='high',
-            recipient='customer'
-        )
-        
-        create_notification(
-            order_id=order['order_id'],
-            notification_type='payment_verification',
-            title='Payment Verification Required',
-            message=f'Payment of ${amount_to_pay:.2f} for order #{order["order_id"][:8]} requires verification.',
-            priority='high',
-            recipient='marketing'
-        )
+    if st.button("Submit Payment", key=f"submit_payment_button_{order.order_id}"):
+        # Update order status and payment details, add tracking update and send notifications
+        try:
+            transition_orders(
+                [order],
+                'PaymentSubmitted',
+                changes={
+                    'payment_status': 'pending_verification',
+                    'payment_method': payment_method,
+                    'payment_amount': amount_to_pay
+                },
+                message=f'Payment of ${amount_to_pay:.2f} submitted via {payment_methods[payment_method]}'
+            )
+        except OrderConflictError as e:
+            st.warning(str(e))
+            return
         
         # Set the payment_submitted flag in session state
         st.session_state.payment_submitted = True
@@ -203,11 +182,11 @@ def show_customer_support_chat(order):
     """Display customer support chat interface for rejected payment terms"""
     st.markdown("### 🤝 Customer Support")
     
-    if order['order_id'] not in st.session_state.chat_history:
-        st.session_state.chat_history[order['order_id']] = []
+    if order.order_id not in st.session_state.chat_history:
+        st.session_state.chat_history[order.order_id] = []
     
     # Display chat history
-    for message in st.session_state.chat_history[order['order_id']]:
+    for message in st.session_state.chat_history[order.order_id]:
         with st.chat_message(message['role']):
             st.write(message['content'])
     
@@ -215,18 +194,18 @@ def show_customer_support_chat(order):
     message = st.chat_input("Type your message here...")
     if message:
         # Add user message to chat history
-        st.session_state.chat_history[order['order_id']].append({
+        st.session_state.chat_history[order.order_id].append({
             'role': 'user',
             'content': message,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            'timestamp': time.time()
         })
         
         # Create notification for marketing team
         create_notification(
-            order_id=order['order_id'],
+            order_id=order.order_id,
             notification_type='support',
             title='New Customer Support Message',
-            message=f'New message from customer regarding order #{order["order_id"][:8]}',
+            message=f'New message from customer regarding order #{order.order_id[:8]}',
             priority='high',
             recipient='marketing'
         )
@@ -245,20 +224,20 @@ def validate_phone(phone):
 
 # Utility functions
 def add_to_cart(seed_data, quantity):
-    cart_item = {
-        'id': str(uuid.uuid4()),
-        'seed': seed_data['Seed'],
-        'quantity': quantity,
-        'price_per_kg': seed_data['Price'],
-        'total_price': quantity * seed_data['Price']
-    }
+    cart_item = CartItem(
+        id=str(uuid.uuid4()),
+        seed=seed_data['Seed'],
+        quantity=quantity,
+        price_per_kg=seed_data['Price'],
+        total_price=quantity * seed_data['Price']
+    )
     st.session_state.cart.append(cart_item)
 
 def remove_from_cart(item_id):
-    st.session_state.cart = [item for item in st.session_state.cart if item['id'] != item_id]
+    st.session_state.cart = [item for item in st.session_state.cart if item.id != item_id]
 
 def calculate_cart_total():
-    return sum(item['total_price'] for item in st.session_state.cart)
+    return sum(item.total_price for item in st.session_state.cart)
 
 def get_status_class(status):
     status_classes = {
@@ -280,84 +259,53 @@ def get_order_progress(status):
     return status_progress.get(status, 0)
 
 
-# Sample catalog data
-catalog = pd.DataFrame({
-    'SeedId':["SEED001","SEED002","SEED003","SEED004","SEED005"],
-    'Seed': ['Dura Palm', 'Pisifera Palm', 'Tenera Palm', 'Compact Palm', 'Elite Palm'],
-    'Description': [
-        'High oil content palm seeds, ideal for commercial plantations.',
-        'Shell-less palm variety with excellent breeding potential.',
-        'Hybrid palm seeds known for exceptional yield and disease resistance.',
-        'Compact growing palm variety suitable for smaller plantations.',
-        'Premium quality seeds with certified genetic superiority.'
-    ],
-    'Price': [15.00, 18.00, 20.00, 16.50, 25.00],
-    'Min_Order': [5, 5, 5, 3, 5],
-    'Germination_Rate': [85, 82, 90, 87, 92],
-    'Maturity_Period': ['24-28 months', '26-30 months', '24-26 months', '22-24 months', '24-28 months'],
-    'Image': [
-        'https://via.placeholder.com/150?text=Dura+Palm',
-        'https://via.placeholder.com/150?text=Pisifera+Palm',
-        'https://via.placeholder.com/150?text=Tenera+Palm',
-        'https://via.placeholder.com/150?text=Compact+Palm',
-        'https://via.placeholder.com/150?text=Elite+Palm'
-    ]
-})
-
 def show_customer_catalog():
     st.markdown('<div class="main-title">🌴 Premium Palm Oil Seeds</div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-title">Available Premium Seeds</div>', unsafe_allow_html=True)
     
     # Filters
+    catalog = get_catalog()
+    search = st.text_input("Search seeds", placeholder="Variety, description or maturity period", key="customer_catalog_search")
     col1, col2 = st.columns(2)
     with col1:
-        price_range = st.slider("Price Range ($)", 0, 30, (0, 30))
+        # Keep every product selectable when the catalog file adds pricier seeds
+        max_price = max(30, math.ceil(catalog.max_price))
+        price_range = st.slider("Price Range ($)", 0, max_price, (0, max_price))
     with col2:
-        sort_by = st.selectbox("Sort by", ["Price: Low to High", "Price: High to Low", "Germination Rate"])
+        sort_by = st.selectbox("Sort by", list(SORT_OPTIONS))
     
-    # Sort catalog
-    if sort_by == "Price: Low to High":
-        catalog_sorted = catalog.sort_values(by="Price")
-    elif sort_by == "Price: High to Low":
-        catalog_sorted = catalog.sort_values(by="Price", ascending=False)
-    else:
-        catalog_sorted = catalog.sort_values(by="Germination_Rate", ascending=False)
-
-    # Display catalog
-    for _, row in catalog_sorted.iterrows():
-        if price_range[0] <= row['Price'] <= price_range[1]:
-            st.markdown(f'<div class="catalog-container">', unsafe_allow_html=True)
+    products = catalog.select(price_range, sort_by, search)
+    if search.strip():
+        st.caption(f"{len(products)} seed{'s' if len(products) != 1 else ''} found, best match first")
+    if not products:
+        st.info("No seeds match your filters.")
+        return
+    
+    # Display only the current page of the catalog
+    offset, limit = page_window('customer_catalog', len(products))
+    for row in products[offset:offset + limit]:
+        st.markdown(f'<div class="catalog-container">', unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.image(get_image_store().thumbnail(row['Image'], row['Seed']), width=150)
+        with col2:
+            st.markdown(f'<div class="sub-title">{row["Seed"]}</div>', unsafe_allow_html=True)
+            st.write(row['Description'])
+            st.write(f"🌱 Germination Rate: {row['Germination_Rate']}%")
+            st.write(f"⏳ Maturity Period: {row['Maturity_Period']}")
+            st.write(f"💰 Price: ${row['Price']} per kg")
             
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col1:
-                st.image(row['Image'], width=150)
-            with col2:
-                st.markdown(f'<div class="sub-title">{row["Seed"]}</div>', unsafe_allow_html=True)
-                st.write(row['Description'])
-                st.write(f"🌱 Germination Rate: {row['Germination_Rate']}%")
-                st.write(f"⏳ Maturity Period: {row['Maturity_Period']}")
-                st.write(f"💰 Price: ${row['Price']} per kg")
-                
-            with col3:
-                quantity = st.number_input("Quantity (kg)", 
-                                        min_value=row['Min_Order'], 
-                                        max_value=100, 
-                                        step=1, 
-                                        key=f"qty_{row['Seed']}")
-                if st.button("Add to Cart", key=f"add_{row['Seed']}"):
-                    add_to_cart(row, quantity)
-                    st.success(f"{row['Seed']} added to cart!")
-            st.markdown('</div>', unsafe_allow_html=True)
-
-def update_order_status(order_id, new_status, message):
-    for order in st.session_state.orders:
-        if order['order_id'] == order_id:
-            order['status'] = new_status
-            order['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': new_status,
-                'message': message
-            })
+        with col3:
+            quantity = st.number_input("Quantity (kg)", 
+                                    min_value=row['Min_Order'], 
+                                    max_value=100, 
+                                    step=1, 
+                                    key=f"qty_{row['SeedId']}")
+            if st.button("Add to Cart", key=f"add_{row['SeedId']}"):
+                add_to_cart(row, quantity)
+                st.success(f"{row['Seed']} added to cart!")
+        st.markdown('</div>', unsafe_allow_html=True)
 
 def show_customer_cart():
     # Initialize session state at the start
@@ -374,14 +322,14 @@ def show_customer_cart():
         col1, col2, col3 = st.columns([2, 1, 1])
         
         with col1:
-            st.write(f"**{item['seed']}**")
-            st.write(f"Quantity: {item['quantity']}kg")
+            st.write(f"**{item.seed}**")
+            st.write(f"Quantity: {item.quantity}kg")
         with col2:
-            st.write(f"Price/kg: ${item['price_per_kg']}")
-            st.write(f"Total: ${item['total_price']:.2f}")
+            st.write(f"Price/kg: ${item.price_per_kg}")
+            st.write(f"Total: ${item.total_price:.2f}")
         with col3:
-            if st.button("Remove", key=f"remove_{item['id']}"):
-                remove_from_cart(item['id'])
+            if st.button("Remove", key=f"remove_{item.id}"):
+                remove_from_cart(item.id)
                 st.rerun()
                 
         st.markdown('</div>', unsafe_allow_html=True)
@@ -419,55 +367,25 @@ def show_customer_cart():
         else:
             # Create order
             order_id = str(uuid.uuid4())
-            order = {
-                'order_id': order_id,
-                'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'items': st.session_state.cart.copy(),
-                'total': calculate_cart_total(),
-                'company_name': company_name,
-                'contact_name': contact_name,
-                'email': email,
-                'phone': phone,
-                'courier_company': courier_company,
-                'special_instructions': special_instructions,
-                'status': 'pending_production',  # Initial status
-                'tracking_updates': [{
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    'status': 'Order Submitted',
-                    'message': 'Order submitted for production approval'
-                }],
-                'production_approved': False,
-                'marketing_approved': False,
-                'payment_status': 'pending',
-                'payment_term': None,
-                'delivery_order': None,
-                'pickup_date': None,
-                'pickup_time': None,  
-            }
-            
-            # Create notification for customer
-            create_notification(
+            order = Order(
                 order_id=order_id,
-                notification_type='order_status',
-                title='Order Submitted Successfully',
-                message=f'Your order #{order_id[:8]} has been submitted and is pending approval.',
-                priority='high',
-                recipient='customer'
+                date=time.time(),
+                items=st.session_state.cart.copy(),
+                total=calculate_cart_total(),
+                company_name=company_name,
+                contact_name=contact_name,
+                email=email,
+                customer_email=st.session_state.get('user_email'),
+                phone=phone,
+                courier_company=courier_company,
+                special_instructions=special_instructions
             )
             
-            # Create notification for production team
-            create_notification(
-                order_id=order_id,
-                notification_type='order_status',
-                title='New Order Submitted',
-                message=f'Order #{order_id[:8]} has been submitted and is awaiting production approval.',
-                priority='high',
-                recipient='production'
-            )
+            # Add order to the shared order store; this starts its timeline
+            get_order_store().add_order(order)
             
-
-             # Add order and notification to session state
-            st.session_state.orders.append(order)
+            # Notify the customer and the production team
+            create_notifications(notifications_for('OrderSubmitted', order))
             
             # Clear cart
             st.session_state.cart = []
@@ -526,9 +444,9 @@ def calculate_payment_details(total_amount, payment_term):
 
 def show_payment_term_selection(order):
     # Initialize session state keys
-    payment_key = f'payment_submitted_{order["order_id"]}'
-    term_key = f'selected_term_{order["order_id"]}'
-    transition_key = f'transition_{order["order_id"]}'
+    payment_key = f'payment_submitted_{order.order_id}'
+    term_key = f'selected_term_{order.order_id}'
+    transition_key = f'transition_{order.order_id}'
     
     if payment_key not in st.session_state:
         st.session_state[payment_key] = False
@@ -538,7 +456,7 @@ def show_payment_term_selection(order):
         st.session_state[transition_key] = False
 
     # Show selection interface for pending payment term
-    if order['status'] == 'pending_payment_term' and not order.get('payment_term') and not st.session_state[payment_key]:
+    if order.status == ORDER_STATUS['PENDING_PAYMENT_TERM'] and not order.payment_term and not st.session_state[payment_key]:
         st.subheader("💳 Select Your Payment Term")
         st.write("Choose the payment option that best suits your business needs. Each option comes with different benefits and terms.")
         
@@ -577,7 +495,7 @@ def show_payment_term_selection(order):
         ]
 
         for term in payment_terms:
-            details = calculate_payment_details(order['total'], term['name'])
+            details = calculate_payment_details(order.total, term['name'])
             
             with st.container():
                 col1, col2 = st.columns([2, 1])
@@ -602,8 +520,8 @@ def show_payment_term_selection(order):
                 # Payment summary
                 st.write("#### Amount Summary")
                 if term['name'] == 'Prepayment':
-                    st.write(f"Original Amount: ${order['total']:.2f}")
-                    st.write(f"Discount Amount: ${order['total'] * 0.05:.2f}")
+                    st.write(f"Original Amount: ${order.total:.2f}")
+                    st.write(f"Discount Amount: ${order.total * 0.05:.2f}")
                     st.write(f"Final Amount: ${details['discounted_amount']:.2f}")
                 else:
                     if details.get('payment_schedule'):
@@ -615,26 +533,20 @@ def show_payment_term_selection(order):
                         st.write(f"Due Date: {details['due_date']}")
 
                 # Selection button
-                if st.button(f"Select {term['name']}", key=f"select_{term['name']}_{order['order_id']}"):
+                if st.button(f"Select {term['name']}", key=f"select_{term['name']}_{order.order_id}"):
+                    try:
+                        transition_orders(
+                            [order],
+                            'PaymentTermSelected',
+                            changes={
+                                'payment_term': term['name'],
+                                'payment_details': details
+                            }
+                        )
+                    except OrderConflictError as e:
+                        st.warning(str(e))
+                        return
                     st.session_state[term_key] = term['name']
-                    order['payment_term'] = term['name']
-                    order['payment_details'] = details
-                    order['status'] = 'pending_payment_approval'
-                    
-                    order['tracking_updates'].append({
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "status": "Payment Term Selected",
-                        "message": f'Payment term "{term["name"]}" has been submitted for review.'
-                    })
-                    
-                    create_notification(
-                        order_id=order['order_id'],
-                        notification_type='payment_term',
-                        title='Payment Term Submitted',
-                        message=f'Payment term "{term["name"]}" submitted for review.',
-                        priority='high',
-                        recipient='marketing'
-                    )
                     
                     st.session_state[payment_key] = True
                     st.session_state[transition_key] = True
@@ -647,22 +559,22 @@ def show_payment_term_selection(order):
                     st.rerun()  # Force a rerun to update the UI immediately
 
     # Show selected term and status
-    elif (order.get('payment_term') or st.session_state[transition_key]):
+    elif (order.payment_term or st.session_state[transition_key]):
         status_display = {
-            'pending_payment_approval': '(Pending Approval)',
-            'payment_terms_approved': '(Approved)',
-            'payment_terms_rejected': '(Rejected)',
-        }.get(order.get('status'), '')
+            ORDER_STATUS['PENDING_PAYMENT_APPROVAL']: '(Pending Approval)',
+            ORDER_STATUS['PAYMENT_TERMS_APPROVED']: '(Approved)',
+            ORDER_STATUS['PAYMENT_TERMS_REJECTED']: '(Rejected)',
+        }.get(order.status, '')
         
         st.subheader(f"💳 Payment Term Status {status_display}")
         
         # Show payment details
-        if order.get('payment_details'):
-            details = order['payment_details']
+        if order.payment_details:
+            details = order.payment_details
             
             st.write("#### Payment Summary")
-            if order['payment_term'] == 'Prepayment':
-                st.write(f"Original Amount: ${order['total']:.2f}")
+            if order.payment_term == 'Prepayment':
+                st.write(f"Original Amount: ${order.total:.2f}")
                 st.write(f"Discount Applied: 5%")
                 st.write(f"Final Amount: ${details['discounted_amount']:.2f}")
             else:
@@ -676,13 +588,13 @@ def show_payment_term_selection(order):
                     st.write(f"Due Date: {details['due_date']}")
         
         # Show appropriate interface based on status
-        if order.get('status') == 'payment_terms_approved':
+        if order.status == ORDER_STATUS['PAYMENT_TERMS_APPROVED']:
             show_payment_section(order)
-        elif order.get('status') == 'payment_terms_rejected':
-            if order.get('rejection_reason'):
-                st.error(f"Rejection Reason: {order['rejection_reason']}")
+        elif order.status == ORDER_STATUS['PAYMENT_TERMS_REJECTED']:
+            if order.rejection_reason:
+                st.error(f"Rejection Reason: {order.rejection_reason}")
             show_customer_support_chat(order)
-        elif order.get('status') == 'pending_payment_approval':
+        elif order.status == ORDER_STATUS['PENDING_PAYMENT_APPROVAL']:
             st.info("Your payment term request is being reviewed. Please wait for approval.")
             
 def show_customer_tracking():
@@ -728,65 +640,78 @@ def show_customer_tracking():
             )
         st.markdown('</div>', unsafe_allow_html=True)
     
-    if not st.session_state.orders:
-        st.info("No orders found")
-        return
-    
-    # Filter orders based on search and filters
-    filtered_orders = st.session_state.orders
+    # Customers only see the orders placed from their own account
+    store = get_order_store()
+    customer_email = st.session_state.get('user_email')
     
-    if search_term:
-        filtered_orders = [
-            order for order in filtered_orders
-            if (search_term.lower() in order['order_id'].lower() or 
-                search_term.lower() in order['company_name'].lower())
-        ]
+    if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+        start = datetime.combine(date_range[0], day_time.min).timestamp()
+        end = datetime.combine(date_range[1], day_time.max).timestamp()
+    else:
+        start = end = None
+    
+    if search_term.strip() or status_filter:
+        if search_term.strip():
+            # Look the term up in the search index, then keep matches in the date range
+            filtered_orders = [
+                order for order in store.search_orders(search_term, customer_email=customer_email)
+                if (start is None or order.date >= start) and (end is None or order.date <= end)
+            ]
+        else:
+            filtered_orders = store.list_orders_between(start, end, customer_email=customer_email)
+        
+        if status_filter:
+            filtered_orders = [
+                order for order in filtered_orders
+                if order.status in status_filter
+            ]
+        total = len(filtered_orders)
+    else:
+        # Unfiltered: count the range on the order date index and fetch only the visible page
+        filtered_orders = None
+        total = store.count_orders_between(start, end, customer_email=customer_email)
     
-    if status_filter:
-        filtered_orders = [
-            order for order in filtered_orders
-            if order['status'] in status_filter
-        ]
+    if not total:
+        st.info("No orders found")
+        return
     
-    if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_orders = [
-            order for order in filtered_orders
-            if start_date <= datetime.strptime(order['date'], "%Y-%m-%d %H:%M:%S").date() <= end_date
-        ]
+    offset, limit = page_window('customer_tracking', total)
+    if filtered_orders is None:
+        page_orders = store.list_orders_between(start, end, customer_email=customer_email,
+                                                offset=offset, limit=limit)
+    else:
+        page_orders = filtered_orders[offset:offset + limit]
     
-    for order in filtered_orders:
+    for order in page_orders:
         st.markdown(f'<div class="catalog-container">', unsafe_allow_html=True)
         # Order Header
         col1, col2 = st.columns([2, 1])
         with col1:
-            st.subheader(f"Order #{format_order_id(order['order_id'])}")
-            st.markdown(f"<div class='tracking-status {get_status_class(order['status'])}'>{order['status']}</div>", 
+            st.subheader(f"Order #{format_order_id(order.order_id)}")
+            st.markdown(f"<div class='tracking-status {get_status_class(order.status)}'>{order.status}</div>", 
                       unsafe_allow_html=True)
         with col2:
-            st.write(f"**Ordered:** {order['date']}")
-            st.write(f"**Total:** ${order['total']:.2f}")
+            st.write(f"**Ordered:** {format_timestamp(order.date)}")
+            st.write(f"**Total:** ${order.total:.2f}")
 
         # Show different sections based on order status
-        if order['status'] in ['pending_payment_term', 'pending_payment_approval', 'payment_terms_approved', 'payment_terms_rejected']:
+        if order.status in PAYMENT_TERM_STATUSES:
             show_payment_term_selection(order)
             
-        elif order['status'] == ORDER_STATUS['PAYMENT_TERM_REJECTED']:
-            show_customer_support_chat(order)
+        elif order.status == ORDER_STATUS['PAYMENT_SUBMITTED']:
+            st.info("Your payment is being verified.")
             
-        elif order['status'] == ORDER_STATUS['PENDING_PAYMENT']:
+        elif order.status == ORDER_STATUS['PAYMENT_CLARIFICATION_REQUIRED']:
+            st.warning(f"Payment clarification required: {order.clarification_reason or 'Please contact us.'}")
             show_payment_section(order)
             
-        elif order['status'] == ORDER_STATUS['PAYMENT_VERIFIED']:
+        elif order.status == ORDER_STATUS['PAYMENT_VERIFIED']:
             st.info("Payment verified. Your order is being processed.")
             
-        elif order['status'] == ORDER_STATUS['DO_GENERATED']:
+        elif order.status == ORDER_STATUS['DO_GENERATED']:
             st.info("Your order is being processed by our team.")
             
-        elif order['status'] == ORDER_STATUS['DO_APPROVED']:
-            st.info("Your order has been approved. Please wait for pickup notification.")
-            
-        elif order['status'] == ORDER_STATUS['READY_FOR_PICKUP']:
+        elif order.status == ORDER_STATUS['READY_FOR_PICKUP']:
             st.success("Your order is ready for pickup! 🎉")
             show_pickup_scheduling(order)
                 
@@ -798,75 +723,63 @@ def show_customer_tracking():
             show_order_details(order)
         
         st.markdown('</div>', unsafe_allow_html=True)
-
-def add_tracking_update(order_id, status, message):
-    """Add a tracking update to an order"""
-    for idx, order in enumerate(st.session_state.orders):
-        if order['order_id'] == order_id:
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': status,
-                'message': message
-            })
-            break
+        mark_seen([order])
 
 def show_pickup_scheduling(order):
     """Display pickup scheduling interface"""
     st.write("### 📅 Schedule Pickup")
     
     # Check if the pickup has already been scheduled
-    if f"pickup_scheduled_{order['order_id']}" not in st.session_state:
-        st.session_state[f"pickup_scheduled_{order['order_id']}"] = False
+    if f"pickup_scheduled_{order.order_id}" not in st.session_state:
+        st.session_state[f"pickup_scheduled_{order.order_id}"] = False
 
-    if not st.session_state[f"pickup_scheduled_{order['order_id']}"]:
+    if not st.session_state[f"pickup_scheduled_{order.order_id}"]:
         col1, col2 = st.columns(2)
         with col1:
             pickup_date = st.date_input(
                 "Select Pickup Date",
                 min_value=datetime.now().date(),
                 max_value=datetime.now().date() + timedelta(days=7),
-                key=f"pickup_date_{order['order_id']}"  # Unique key using order ID
+                key=f"pickup_date_{order.order_id}"  # Unique key using order ID
             )
         with col2:
             pickup_time = st.selectbox(
                 "Select Pickup Time",
                 ["9:00 AM", "10:00 AM", "11:00 AM", "2:00 PM", "3:00 PM", "4:00 PM"],
-                key=f"pickup_time_{order['order_id']}"  # Unique key using order ID
+                key=f"pickup_time_{order.order_id}"  # Unique key using order ID
             )
         
-        if st.button("Schedule Pickup", key=f"schedule_pickup_{order['order_id']}"):  # Unique key for button
-            # Update order with pickup details
-            for idx, o in enumerate(st.session_state.orders):
-                if o['order_id'] == order['order_id']:
-                    st.session_state.orders[idx]['pickup_date'] = pickup_date.strftime("%Y-%m-%d")
-                    st.session_state.orders[idx]['pickup_time'] = pickup_time
-                    
-                    # Add tracking update
-                    add_tracking_update(
-                        order_id=order['order_id'],
-                        status="Pickup Scheduled",
-                        message=f"Pickup scheduled for {pickup_date.strftime('%Y-%m-%d')} at {pickup_time}"
-                    )
-                    
-                    # Set the flag to true to hide the inputs
-                    st.session_state[f"pickup_scheduled_{order['order_id']}"] = True
-                    st.success("Pickup scheduled successfully!")
-                    st.rerun()
+        if st.button("Schedule Pickup", key=f"schedule_pickup_{order.order_id}"):  # Unique key for button
+            # Update order with pickup details and add tracking update
+            try:
+                transition_orders(
+                    [order],
+                    'PickupScheduled',
+                    changes={
+                        'pickup_date': pickup_date.strftime("%Y-%m-%d"),
+                        'pickup_time': pickup_time
+                    }
+                )
+            except OrderConflictError as e:
+                st.warning(str(e))
+                return
+            
+            # Set the flag to true to hide the inputs
+            st.session_state[f"pickup_scheduled_{order.order_id}"] = True
+            st.success("Pickup scheduled successfully!")
+            st.rerun()
     else:
-        # Find the order index again to use it safely
-        for idx, o in enumerate(st.session_state.orders):
-            if o['order_id'] == order['order_id']:
-                st.success(f"Pickup scheduled for {o['pickup_date']} at {o['pickup_time']}")
-                if st.button("Mark as Received", key=f"mark_received_{order['order_id']}"):
-                    st.session_state.orders[idx]['status'] = ORDER_STATUS['COMPLETED']
-                    add_tracking_update(
-                        order_id=order['order_id'],
-                        status="Completed",
-                        message="Order has been received by the customer."
-                    )
-                    st.success("Order marked as received!")
-                    st.rerun()
-                break
+        # Look up the latest copy of the order
+        o = get_order_store().get_order(order.order_id)
+        st.success(f"Pickup scheduled for {o.pickup_date} at {o.pickup_time}")
+        if st.button("Mark as Received", key=f"mark_received_{order.order_id}"):
+            try:
+                transition_orders([order], 'Completed')
+            except OrderConflictError as e:
+                st.warning(str(e))
+            else:
+                st.success("Order marked as received!")
+                st.rerun()
 
 def show_order_timeline(order):
     """Display order timeline with all status updates"""
@@ -892,7 +805,9 @@ def show_order_timeline(order):
         'Payment Term Selected': '🗓️',
     }
     
-    if not order.get('tracking_updates'):
+    # The timeline is read from the order's event log
+    tracking_updates = get_order_store().get_tracking_updates(order.order_id)
+    if not tracking_updates:
         st.info("No tracking updates available")
         return
     
@@ -933,16 +848,16 @@ def show_order_timeline(order):
 
     # Generate the timeline with icons and statuses
     st.markdown('<div class="timeline">', unsafe_allow_html=True)
-    for update in reversed(order['tracking_updates']):
-        icon = STATUS_ICONS.get(update['status'], '•')  # Default icon if status is not found
+    for update in reversed(tracking_updates):
+        icon = STATUS_ICONS.get(update.status, '•')  # Default icon if status is not found
         st.markdown(
             f"""
             <div class="timeline-item">
                 <div class="timeline-icon">{icon}</div>
                 <div class="timeline-content">
-                    <div class="timeline-timestamp">{update['timestamp']}</div>
-                    <div class="timeline-status">{update['status']}</div>
-                    <div class="timeline-message">{update['message']}</div>
+                    <div class="timeline-timestamp">{format_timestamp(update.timestamp)}</div>
+                    <div class="timeline-status">{update.status}</div>
+                    <div class="timeline-message">{update.message}</div>
                 </div>
             </div>
             """,
@@ -956,33 +871,33 @@ def show_order_details(order):
     
     with col1:
         st.write("**Order Information:**")
-        st.write(f"Company: {order['company_name']}")
-        st.write(f"Contact: {order['contact_name']}")
-        st.write(f"Phone: {order['phone']}")
-        st.write(f"Courier: {order['courier_company']}")
+        st.write(f"Company: {order.company_name}")
+        st.write(f"Contact: {order.contact_name}")
+        st.write(f"Phone: {order.phone}")
+        st.write(f"Courier: {order.courier_company}")
     
     with col2:
         st.write("**Items:**")
-        for item in order['items']:
-            st.write(f"- {item['seed']}: {item['quantity']}kg (${item['total_price']:.2f})")
+        for item in order.items:
+            st.write(f"- {item.seed}: {item.quantity}kg (${item.total_price:.2f})")
         
-        if order.get('special_instructions'):
+        if order.special_instructions:
             st.write("**Special Instructions:**")
-            st.write(order['special_instructions'])   
+            st.write(order.special_instructions)   
 
         
 def show_delivery_order(order):
     """Display delivery order details after marketing approval"""
     st.markdown("### 📋 Delivery Order")
     
-    if order['status'] not in [ORDER_STATUS['DO_APPROVED'], ORDER_STATUS['READY_FOR_PICKUP']]:
+    if order.status not in [ORDER_STATUS['READY_FOR_PICKUP'], ORDER_STATUS['COMPLETED']]:
         st.info("Delivery order is being processed...")
         return
         
     # Display delivery order details
-    st.write(f"**DO Number:** {order['delivery_order']['do_number']}")
-    st.write(f"**Generated Date:** {order['delivery_order']['generated_date']}")
-    st.write(f"**Valid Until:** {order['delivery_order']['validity']}")
+    st.write(f"**DO Number:** {order.delivery_order['do_number']}")
+    st.write(f"**Generated Date:** {order.delivery_order['generated_date']}")
+    st.write(f"**Valid Until:** {order.delivery_order['validity']}")
     
     # Download button for DO
     if st.button("Download Delivery Order"):
@@ -0,0 +1,56 @@
+# database.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Idle connections a pool keeps open for reuse
+POOL_SIZE = 4
+
+
+class ConnectionPool:
+    """A small pool of SQLite connections to a database file in WAL mode.
+
+    Streamlit runs each script run on a fresh thread, so connections are not
+    tied to threads: a caller borrows one for a unit of work and hands it back.
+    Connections are opened with check_same_thread=False for that reason and
+    are only ever used by one caller at a time. Up to `size` idle connections
+    are kept; a borrow when none is idle opens another.
+    """
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
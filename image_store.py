@@ -0,0 +1,243 @@
+# image_store.py
+import hashlib
+import io
+import json
+import os
+import textwrap
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+# Relative image paths in the catalog are resolved against the app directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where fetched images and thumbnails are kept; override with SEED_SALES_IMAGES
+IMAGE_DIR = os.environ.get('SEED_SALES_IMAGES', os.path.join(BASE_DIR, 'data', 'image_cache'))
+
+# Set SEED_SALES_OFFLINE=1 to never fetch remote images, e.g. in tests
+OFFLINE = os.environ.get('SEED_SALES_OFFLINE') == '1'
+
+THUMBNAIL_SIZE = (150, 150)
+FETCH_TIMEOUT = 5
+# Seconds before a source that failed to fetch is tried again
+RETRY_AFTER = 600
+# Thumbnails and placeholders held in memory
+MEMORY_CACHE_SIZE = 1000
+# Threads loading images in the background
+WARM_WORKERS = 4
+
+
+def _is_remote(source):
+    return source.startswith(('http://', 'https://'))
+
+
+class ImageStore:
+    """Content-addressed store of product images and their thumbnails.
+
+    Each image source, a URL or a local file path, is fetched or read once;
+    its bytes are stored under their SHA-256 and a fixed-size PNG thumbnail
+    is generated right away. sources.json maps every source to its digest,
+    so later runs and restarts go straight to the thumbnail on disk, and
+    recently used thumbnails are kept in memory. Local files are recorded
+    with their modification time and size, so replacing one is picked up.
+
+    Rendering never waits on the network: warm() loads sources on background
+    threads, and is run whenever a catalog version loads, while thumbnail()
+    returns a generated placeholder showing the product name for a remote
+    source that isn't in the store yet. The same placeholder stands in for
+    any source that can't be loaded, including every remote one while offline.
+
+    Thumbnails are handed to st.image as bytes, which Streamlit serves from
+    a URL derived from their content with an ETag, so browsers can reuse
+    them across reruns.
+    """
+
+    def __init__(self, root=IMAGE_DIR, offline=OFFLINE, thumbnail_size=THUMBNAIL_SIZE):
+        self.root = root
+        self.offline = offline
+        self.thumbnail_size = thumbnail_size
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # digest or placeholder label -> PNG bytes
+        self._failed = {}  # source key -> time of the last failed load
+        self._pending = set()  # sources queued for warm()
+        self._executor = ThreadPoolExecutor(WARM_WORKERS, thread_name_prefix='image-warm')
+        os.makedirs(os.path.join(root, 'originals'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'thumbs'), exist_ok=True)
+        self._sources_path = os.path.join(root, 'sources.json')
+        try:
+            with open(self._sources_path) as f:
+                self._sources = json.load(f)
+        except (OSError, ValueError):
+            self._sources = {}
+
+    def _original_path(self, digest):
+        return os.path.join(self.root, 'originals', digest)
+
+    def _thumbnail_path(self, digest):
+        width, height = self.thumbnail_size
+        return os.path.join(self.root, 'thumbs', f"{digest}-{width}x{height}.png")
+
+    def import_bytes(self, data):
+        """Store image bytes and their thumbnail; returns the digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._original_path(digest)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        if not os.path.exists(self._thumbnail_path(digest)):
+            _write_atomic(self._thumbnail_path(digest), self._make_thumbnail(data))
+        return digest
+
+    def _source_key(self, source):
+        """Key a source is recorded under: a URL as is, a local file with its
+        modification time and size. None if the local file is missing."""
+        if _is_remote(source):
+            return source
+        try:
+            stat = os.stat(os.path.join(BASE_DIR, source))
+        except OSError:
+            return None
+        return f"{source}#{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _stored(self, key):
+        """Digest recorded for a source key whose thumbnail is on disk, or None."""
+        digest = self._sources.get(key)
+        if digest is not None and os.path.exists(self._thumbnail_path(digest)):
+            return digest
+        return None
+
+    def _retry_pending(self, key):
+        failed_at = self._failed.get(key)
+        return failed_at is not None and time.time() - failed_at < RETRY_AFTER
+
+    def import_source(self, source):
+        """Load an image source into the store once; returns its digest, or None if it can't be loaded."""
+        key = self._source_key(source)
+        if key is None:
+            return None
+        digest = self._stored(key)
+        if digest is not None:
+            return digest
+
+        if self._retry_pending(key):
+            return None
+        try:
+            digest = self.import_bytes(self._read_source(source))
+        except (OSError, requests.RequestException, Image.UnidentifiedImageError, ValueError):
+            self._failed[key] = time.time()
+            return None
+
+        with self._lock:
+            self._sources[key] = digest
+            _write_atomic(self._sources_path, json.dumps(self._sources, indent=1).encode())
+        return digest
+
+    def warm(self, sources):
+        """Load image sources into the store on background threads; returns at once."""
+        for source in sources:
+            if not source:
+                continue
+            with self._lock:
+                if source in self._pending:
+                    continue
+                self._pending.add(source)
+            self._executor.submit(self._warm_source, source)
+
+    def _warm_source(self, source):
+        try:
+            self.import_source(source)
+        finally:
+            with self._lock:
+                self._pending.discard(source)
+
+    def _read_source(self, source):
+        if _is_remote(source):
+            if self.offline:
+                raise ValueError("Remote images are disabled")
+            response = requests.get(source, timeout=FETCH_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+        with open(os.path.join(BASE_DIR, source), 'rb') as f:
+            return f.read()
+
+    def _make_thumbnail(self, data):
+        with Image.open(io.BytesIO(data)) as image:
+            thumbnail = ImageOps.pad(image.convert('RGB'), self.thumbnail_size, color='white')
+        return _png_bytes(thumbnail)
+
+    def placeholder(self, label):
+        """PNG thumbnail showing a label, for products without a loadable image."""
+        image = Image.new('RGB', self.thumbnail_size, '#E8F5E9')
+        draw = ImageDraw.Draw(image)
+        text = '\n'.join(textwrap.wrap(label, 14)) or 'No image'
+        draw.multiline_text(
+            (self.thumbnail_size[0] / 2, self.thumbnail_size[1] / 2), text,
+            fill='#2E7D32', font=ImageFont.load_default(), anchor='mm', align='center'
+        )
+        return _png_bytes(image)
+
+    def thumbnail(self, source, label=''):
+        """Return PNG bytes of the thumbnail for an image source, or a placeholder showing `label`.
+
+        A remote source not yet in the store is queued for warm() rather than fetched here.
+        """
+        key = self._source_key(source) if source else None
+        digest = self._sources.get(key) if key else None
+        if digest is not None:
+            data = self._remember(digest)
+            if data is not None:
+                return data
+            digest = self._stored(key)
+
+        if digest is None and key is not None:
+            if _is_remote(source):
+                if not self._retry_pending(key):
+                    self.warm([source])
+            else:
+                digest = self.import_source(source)
+        if digest is None:
+            # Placeholders are remembered by label; the source is retried after RETRY_AFTER
+            key = ('placeholder', label)
+            data = self._remember(key)
+            if data is None:
+                data = self._remember(key, self.placeholder(label))
+            return data
+        with open(self._thumbnail_path(digest), 'rb') as f:
+            return self._remember(digest, f.read())
+
+    def _remember(self, key, data=None):
+        """Look up, or with `data` store, an entry of the in-memory cache."""
+        with self._lock:
+            if data is None:
+                data = self._memory.get(key)
+                if data is not None:
+                    self._memory.move_to_end(key)
+                return data
+            self._memory[key] = data
+            if len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+            return data
+
+
+def _png_bytes(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _write_atomic(path, data):
+    """Write a file so readers never see it half-written."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+@st.cache_resource
+def get_image_store():
+    """Return the image store shared by all sessions in this server process."""
+    return ImageStore()
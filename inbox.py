@@ -0,0 +1,296 @@
+# inbox.py
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+
+DAY = 24 * 60 * 60
+
+# Seconds within which notifications of the same type and title coalesce into one digest
+DIGEST_WINDOW = 15 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class RetentionPolicy:
+    """Bounds on what an inbox keeps in memory; evicted notifications are archived."""
+    max_age_days: float = 30  # Anything older is evicted, read or not
+    archive_read_after_days: float = 7  # Read notifications older than this are evicted
+    max_count: int = 200  # The oldest notifications beyond this are evicted
+
+
+def dedup_key(order_id, notification_type, title):
+    """Key under which an inbox holds at most one notification."""
+    return (order_id, notification_type, title)
+
+
+class _Timeline:
+    """Entries in arrival order, addressable by sequence number."""
+
+    __slots__ = ('seqs', 'entries')
+
+    def __init__(self):
+        self.seqs = []
+        self.entries = []
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def append(self, seq, entry):
+        self.seqs.append(seq)
+        self.entries.append(entry)
+
+    def _index(self, seq):
+        index = bisect_left(self.seqs, seq)
+        return index if index < len(self.seqs) and self.seqs[index] == seq else None
+
+    def get(self, seq):
+        """Return the entry at a sequence number, or None."""
+        index = self._index(seq)
+        return None if index is None else self.entries[index]
+
+    def remove(self, seq):
+        index = self._index(seq)
+        if index is not None:
+            del self.seqs[index]
+            del self.entries[index]
+
+    def newest_first(self, before=None, since=None):
+        """Yield (seq, entry) pairs newest first, for before > seq >= since."""
+        end = len(self.seqs) if before is None else bisect_left(self.seqs, before)
+        start = 0 if since is None else bisect_left(self.seqs, since)
+        for index in range(end - 1, start - 1, -1):
+            yield self.seqs[index], self.entries[index]
+
+    def discard(self, ids):
+        kept = [(seq, entry) for seq, entry in zip(self.seqs, self.entries) if entry.id not in ids]
+        self.seqs = [seq for seq, _ in kept]
+        self.entries = [entry for _, entry in kept]
+
+
+class Inbox:
+    """One recipient's notifications, iterated newest first, with indexes for the page filters.
+
+    Every entry gets an increasing sequence number on arrival and is appended
+    to a timeline, so adding one is an append and the newest come first by
+    reading from the end, with no sorting. Alongside the full timeline the
+    inbox keeps one per priority, one per type and one of the unread entries;
+    queries walk the smallest that applies and check the rest by lookup. A sequence number doubles as a
+    cursor, so page() can resume below it without scanning what came before.
+
+    A notification arriving within `digest_window` seconds of an unread one
+    with the same type and title is coalesced into it: the earlier entry
+    becomes a digest whose `details` hold each notification, so a bulk run of
+    approvals shows as one card. Each addition takes the digest's timestamp
+    up to the newest member and moves it to the head of the inbox, as if it
+    had just arrived. Reading a digest closes it, and the next notification
+    starts a new entry.
+
+    The key set, the id lookup and the unread index are maintained on every
+    insert, removal and mark-as-read, so checking whether a notification
+    already exists and counting unread ones take constant time however large
+    the inbox grows. mark_all_read() only moves a watermark; entries below it
+    have their read flag set as queries reach them. Mark notifications read
+    through the inbox so the indexes stay in step. `version` changes with
+    every change, so pollers can tell whether anything needs redrawing.
+    """
+
+    def __init__(self, notifications=(), digest_window=DIGEST_WINDOW):
+        self._seq = 0
+        # Entries up to this sequence number count as read
+        self._read_through = 0
+        # Entry id -> sequence number, for every entry in the inbox
+        self._seqs = {}
+        self._timeline = _Timeline()
+        self._by_priority = {}
+        self._by_type = {}
+        # Unread entries, so unread-only queries and counts don't visit read ones
+        self._unread = _Timeline()
+        self._keys = set()
+        # Notification id -> the entry holding it
+        self._by_id = {}
+        # (type, title) -> latest entry, which later notifications may coalesce into
+        self._digests = {}
+        self.digest_window = digest_window
+        self.version = 0
+        for notification in notifications:
+            self.add(notification)
+
+    def __len__(self):
+        return len(self._seqs)
+
+    def __iter__(self):
+        return iter(list(self.filter()))
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    @property
+    def unread_count(self):
+        return len(self._unread)
+
+    def _is_read(self, entry):
+        # Apply a pending mark_all_read() to the entry's flags
+        if not entry.read and self._seqs[entry.id] <= self._read_through:
+            entry.read = True
+            for detail in entry.details:
+                detail.read = True
+        return entry.read
+
+    def add(self, notification):
+        """Add a notification unless one with the same dedup key exists; returns whether it was added."""
+        key = dedup_key(notification.order_id, notification.type, notification.title)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+
+        group = (notification.type, notification.title)
+        digest = self._digests.get(group)
+        if (digest is not None and not self._is_read(digest) and not notification.read
+                and abs(notification.timestamp - digest.timestamp) <= self.digest_window):
+            if not digest.details:
+                digest.details = [replace(digest, details=[])]
+            digest.details.append(notification)
+            self._by_id[notification.id] = digest
+            digest.timestamp = max(digest.timestamp, notification.timestamp)
+            self._resequence(digest)
+            self.version += 1
+            return True
+
+        self._seq += 1
+        seq = self._seq
+        self._seqs[notification.id] = seq
+        for timeline in self._timelines_of(notification):
+            timeline.append(seq, notification)
+        if not notification.read:
+            self._unread.append(seq, notification)
+        self._by_id[notification.id] = notification
+        self._digests[group] = notification
+        self.version += 1
+        return True
+
+    def _timelines_of(self, entry):
+        return (
+            self._timeline,
+            self._by_priority.setdefault(entry.priority.lower(), _Timeline()),
+            self._by_type.setdefault(entry.type, _Timeline()),
+        )
+
+    def _resequence(self, entry):
+        """Give an entry the next sequence number, moving it to the head of its timelines."""
+        old_seq = self._seqs[entry.id]
+        self._seq += 1
+        seq = self._seqs[entry.id] = self._seq
+        timelines = self._timelines_of(entry)
+        if self._unread.get(old_seq) is entry:
+            timelines += (self._unread,)
+        for timeline in timelines:
+            timeline.remove(old_seq)
+            timeline.append(seq, entry)
+
+    def get(self, notification_id):
+        """Return the entry holding a notification; for coalesced ones, their digest."""
+        return self._by_id.get(notification_id)
+
+    def cursor(self, entry):
+        """Position of an entry, for page(before=...) and page(since=...)."""
+        return self._seqs[entry.id]
+
+    def filter(self, read=None, priority=None, notification_type=None, before=None, since=None):
+        """Yield entries matching every criterion given, newest first.
+
+        `before` and `since` are cursors bounding the entries' positions.
+        Don't add, remove or mark entries while iterating; take a list first.
+        """
+        timelines = [self._timeline]
+        if read is False:
+            timelines.append(self._unread)
+        if priority is not None:
+            timelines.append(self._by_priority.get(priority.lower(), _Timeline()))
+        if notification_type is not None:
+            timelines.append(self._by_type.get(notification_type, _Timeline()))
+        smallest = min(timelines, key=len)
+
+        for seq, entry in smallest.newest_first(before, since):
+            if priority is not None and entry.priority.lower() != priority.lower():
+                continue
+            if notification_type is not None and entry.type != notification_type:
+                continue
+            if read is not None and smallest is not self._unread and (self._unread.get(seq) is None) != read:
+                continue
+            self._is_read(entry)
+            yield entry
+
+    def page(self, limit=None, read=None, priority=None, notification_type=None, before=None, since=None):
+        """Return up to `limit` matching entries, newest first, and whether more remain below them.
+
+        Pass the cursor() of the last entry as `before` to get the next page.
+        """
+        entries = []
+        for entry in self.filter(read, priority, notification_type, before, since):
+            if limit is not None and len(entries) == limit:
+                return entries, True
+            entries.append(entry)
+        if since is not None and entries:
+            # Entries below the window were not visited
+            below = self.filter(read, priority, notification_type, before=self.cursor(entries[-1]))
+            return entries, next(below, None) is not None
+        return entries, False
+
+    def mark_read(self, notification):
+        """Mark a notification read; returns whether it was unread."""
+        seq = self._seqs.get(notification.id)
+        if seq is None or self._unread.get(seq) is not notification:
+            return False
+        notification.read = True
+        for detail in notification.details:
+            detail.read = True
+        self._unread.remove(seq)
+        self.version += 1
+        return True
+
+    def mark_all_read(self):
+        """Mark every entry read at once by moving the read watermark."""
+        self._read_through = self._seq
+        self._unread = _Timeline()
+        self.version += 1
+
+    def expired(self, policy, now):
+        """Return the notifications the retention policy evicts, oldest first.
+
+        Notifications arrive in time order, so only the old end of the inbox is scanned.
+        """
+        age_cutoff = now - policy.max_age_days * DAY
+        read_cutoff = now - policy.archive_read_after_days * DAY
+        scan_cutoff = max(age_cutoff, read_cutoff)
+        overflow = len(self._timeline) - policy.max_count
+        expired = []
+        for index, notification in enumerate(self._timeline.entries):
+            if index >= overflow and notification.timestamp >= scan_cutoff:
+                break
+            if (index < overflow or notification.timestamp < age_cutoff
+                    or (self._is_read(notification) and notification.timestamp < read_cutoff)):
+                expired.append(notification)
+        return expired
+
+    def remove(self, notifications):
+        """Drop the given entries, with everything coalesced into them, e.g. when retention evicts them."""
+        removed = set()
+        for notification in notifications:
+            entry_id = notification.id
+            if self._by_id.get(entry_id) is not notification or entry_id not in self._seqs:
+                continue
+            self._is_read(notification)
+            del self._seqs[entry_id]
+            for member in notification.details or (notification,):
+                self._keys.discard(dedup_key(member.order_id, member.type, member.title))
+                self._by_id.pop(member.id, None)
+            group = (notification.type, notification.title)
+            if self._digests.get(group) is notification:
+                del self._digests[group]
+            removed.add(entry_id)
+        if not removed:
+            return
+        self.version += 1
+        self._timeline.discard(removed)
+        self._unread.discard(removed)
+        for timelines in (self._by_priority, self._by_type):
+            for timeline in timelines.values():
+                timeline.discard(removed)
@@ -0,0 +1,183 @@
+# indexes.py
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+
+_timestamp_key = itemgetter(0)
+
+# Sorts after every character that can follow a prefix
+_PREFIX_END = '\U0010ffff'
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens for searching."""
+    return re.findall(r'\w+', text.lower())
+
+
+def _prefix_slice(keys, prefix):
+    """Return the keys of a sorted list of strings that start with prefix."""
+    return keys[bisect_left(keys, prefix):bisect_left(keys, prefix + _PREFIX_END)]
+
+
+class TimeIndex:
+    """Values kept sorted by timestamp, answering range queries by binary search.
+
+    Entries almost always arrive in time order and are appended; older
+    timestamps are inserted in place. Entries live in a single list of
+    (timestamp, value) pairs so readers always see a consistent list.
+    """
+
+    def __init__(self):
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return (value for _, value in list(self._entries))
+
+    def add(self, timestamp, value):
+        if not self._entries or timestamp >= self._entries[-1][0]:
+            self._entries.append((timestamp, value))
+        else:
+            insort(self._entries, (timestamp, value), key=_timestamp_key)
+
+    def _bounds(self, entries, start, end):
+        lo = 0 if start is None else bisect_left(entries, start, key=_timestamp_key)
+        hi = len(entries) if end is None else bisect_right(entries, end, key=_timestamp_key)
+        return lo, hi
+
+    def count(self, start=None, end=None):
+        """Return the number of values with start <= timestamp <= end."""
+        lo, hi = self._bounds(self._entries, start, end)
+        return hi - lo
+
+    def between(self, start=None, end=None, offset=0, limit=None):
+        """Return values with start <= timestamp <= end, oldest first.
+
+        `offset` and `limit` select one page of the range without copying the rest.
+        """
+        entries = self._entries
+        lo, hi = self._bounds(entries, start, end)
+        lo += offset
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [value for _, value in entries[lo:hi]]
+
+
+class SearchIndex:
+    """Order IDs and company names indexed for search-as-you-type lookups.
+
+    Order IDs are kept sorted so an ID prefix (such as the 8-character IDs
+    shown in the UI) is found by binary search. Company names are split into
+    word tokens; each token maps to the orders whose company name contains
+    it, and the sorted token list answers token prefixes the same way.
+    """
+
+    def __init__(self):
+        # Sorted lowercase order IDs, mapped back to the stored IDs
+        self._ids = []
+        self._id_lookup = {}
+        # token -> {order_id: None}, and the tokens in sorted order
+        self._postings = {}
+        self._tokens = []
+
+    def add(self, order_id, company_name):
+        key = order_id.lower()
+        self._id_lookup[key] = order_id
+        insort(self._ids, key)
+        self._add_company(order_id, company_name)
+
+    def rename_company(self, order_id, old_name, new_name):
+        for token in set(tokenize(old_name or '')):
+            self._postings.get(token, {}).pop(order_id, None)
+        self._add_company(order_id, new_name)
+
+    def _add_company(self, order_id, company_name):
+        for token in set(tokenize(company_name or '')):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._tokens, token)
+            postings[order_id] = None
+
+    def search(self, term):
+        """Return the IDs of orders whose ID starts with `term` or whose company
+        name has a word starting with each word of `term`."""
+        term = term.strip().lower().lstrip('#')
+        if not term:
+            return set()
+
+        matches = {self._id_lookup[key] for key in _prefix_slice(self._ids, term)}
+
+        company_matches = None
+        for word in tokenize(term):
+            word_matches = set()
+            for token in _prefix_slice(self._tokens, word):
+                word_matches.update(self._postings[token])
+            company_matches = word_matches if company_matches is None else company_matches & word_matches
+            if not company_matches:
+                break
+        return matches | (company_matches or set())
+
+
+class RankedIndex:
+    """Inverted index over weighted text fields, returning documents best match first.
+
+    Each document's fields are split into tokens; a token's posting maps the
+    documents containing it to the weight of the field it appears in (summed
+    if it appears in several). Like SearchIndex, every word of a query must be
+    a prefix of some token of a document. A document scores, for each word,
+    its best matching token's weight times the token's inverse document
+    frequency, with whole-word matches counting double.
+    """
+
+    def __init__(self):
+        # token -> {doc_id: weight}, and the tokens in sorted order
+        self._postings = {}
+        self._tokens = []
+        # doc_id -> position it was added at, to break ties
+        self._docs = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id, fields):
+        """Index a document given as (text, weight) pairs."""
+        self._docs.setdefault(doc_id, len(self._docs))
+        for text, weight in fields:
+            for token in set(tokenize(text or '')):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    insort(self._tokens, token)
+                postings[doc_id] = postings.get(doc_id, 0) + weight
+
+    def search(self, query, limit=None):
+        """Return the IDs of documents matching every word of `query`, best first."""
+        scores = None
+        for word in set(tokenize(query)):
+            word_scores = {}
+            for token in _prefix_slice(self._tokens, word):
+                postings = self._postings[token]
+                boost = 2 if token == word else 1
+                idf = math.log(1 + len(self._docs) / len(postings))
+                for doc_id, weight in postings.items():
+                    score = weight * idf * boost
+                    if score > word_scores.get(doc_id, 0):
+                        word_scores[doc_id] = score
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {doc_id: score + word_scores[doc_id] for doc_id, score in scores.items() if doc_id in word_scores}
+            if not scores:
+                return []
+
+        if not scores:
+            return []
+        key = lambda doc_id: (-scores[doc_id], self._docs[doc_id])
+        if limit is None:
+            return sorted(scores, key=key)
+        return heapq.nsmallest(limit, scores, key=key)
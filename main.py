@@ -1,7 +1,6 @@
 # main.py
 import streamlit as st
 import uuid  # Add this import at the top of the file
-import pandas as pd
 
 # Page config
 st.set_page_config(
@@ -10,8 +9,8 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
-from datetime import datetime
 import hashlib
+import math
 import re
 import time
 from customer_module import (
@@ -25,10 +24,17 @@ from notification import (
     show_notifications_customer,
     show_marketing_notifications,
     show_do_notifications,
-    initialize_notifications
+    initialize_notifications,
+    get_inbox,
+    sync_inbox,
+    NOTIFICATION_REFRESH_SECONDS
 )
 from production_module import (show_production_dashboard,show_pending_orders,show_inventory_management,show_order_history,show_do_management)
 from marketing_module import (show_marketing_dashboard,show_payment_approvals,show_customer_support,show_do_notifications)
+from order_store import get_order_store
+from catalog_store import SORT_OPTIONS, get_catalog
+from image_store import get_image_store
+from pagination import page_window
 
 
 # User roles and their corresponding pages
@@ -161,24 +167,18 @@ def get_notification_count(role, page_id=None):
     """
     Get number of unread notifications for the specified role and page
     """
+    # Counters are maintained as notifications and orders change, so this is O(1)
     if role == 'customer':
-        if 'notification_customer' not in st.session_state:
-            return 0
-        return len([n for n in st.session_state.notification_customer if not n.get('read', False)])
+        return get_inbox('notification_customer').unread_count
     elif role == 'production':
-        if 'production_notifications' not in st.session_state:
-            return 0
-        return len([n for n in st.session_state.production_notifications if not n.get('read', False)])
+        return get_inbox('production_notifications').unread_count
     elif role == 'marketing':
         if page_id == 'do_notifications':
             # Only count actual pending DO notifications
-            return len([order for order in st.session_state.orders 
-                       if order.get('status') == 'do_generated' and not order.get('notification_read', False)])
+            return get_order_store().count_pending_do()
         elif page_id == 'marketing_notifications':
-            if 'marketing_notifications' not in st.session_state:
-                return 0
             # Only count unread marketing notifications
-            return len([n for n in st.session_state.marketing_notifications if not n.get('read', False)])
+            return get_inbox('marketing_notifications').unread_count
     return 0
 
 def show_sidebar():
@@ -215,6 +215,7 @@ def main():
     # Initialize session state
     init_session_state()
     initialize_notifications()
+    sync_inbox()
     
     # Show different pages based on authentication state
     if not st.session_state.authenticated:
@@ -463,57 +464,44 @@ def show_public_catalog():
     st.markdown('<div class="sub-title">Available Premium Seeds</div>', unsafe_allow_html=True)
     
     # Filters
+    catalog = get_catalog()
+    search = st.text_input("Search seeds", placeholder="Variety, description or maturity period", key="public_catalog_search")
     col1, col2 = st.columns(2)
     with col1:
-        price_range = st.slider("Price Range ($)", 0, 30, (0, 30))
+        # Keep every product selectable when the catalog file adds pricier seeds
+        max_price = max(30, math.ceil(catalog.max_price))
+        price_range = st.slider("Price Range ($)", 0, max_price, (0, max_price))
     with col2:
-        sort_by = st.selectbox("Sort by", ["Price: Low to High", "Price: High to Low", "Germination Rate"])
+        sort_by = st.selectbox("Sort by", list(SORT_OPTIONS))
     
-    # Sample catalog data - replace with your actual catalog data
-    catalog = pd.DataFrame({
-        'Seed': ['Premium Palm Seeds', 'Standard Palm Seeds', 'Elite Palm Seeds'],
-        'Description': [
-            'High-yield palm seeds with excellent germination rate',
-            'Quality palm seeds for commercial plantations',
-            'Premium grade seeds with superior genetics'
-        ],
-        'Price': [15.00, 12.00, 18.00],
-        'Germination_Rate': [95, 85, 98],
-        'Maturity_Period': ['4-5 months', '5-6 months', '4-5 months'],
-        'Min_Order': [10, 20, 10],
-        'Image': ['path/to/image1.jpg', 'path/to/image2.jpg', 'path/to/image3.jpg']
-    })
+    products = catalog.select(price_range, sort_by, search)
+    if search.strip():
+        st.caption(f"{len(products)} seed{'s' if len(products) != 1 else ''} found, best match first")
+    if not products:
+        st.info("No seeds match your filters.")
+        return
     
-    # Sort catalog
-    if sort_by == "Price: Low to High":
-        catalog_sorted = catalog.sort_values(by="Price")
-    elif sort_by == "Price: High to Low":
-        catalog_sorted = catalog.sort_values(by="Price", ascending=False)
-    else:
-        catalog_sorted = catalog.sort_values(by="Germination_Rate", ascending=False)
-    
-    # Display catalog
-    for _, row in catalog_sorted.iterrows():
-        if price_range[0] <= row['Price'] <= price_range[1]:
-            st.markdown(f'<div class="catalog-container">', unsafe_allow_html=True)
-            
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col1:
-                # You can replace this with actual image display
-                st.markdown("🌱")  # Placeholder for image
-            with col2:
-                st.markdown(f'<div class="sub-title">{row["Seed"]}</div>', unsafe_allow_html=True)
-                st.write(row['Description'])
-                st.write(f"🌱 Germination Rate: {row['Germination_Rate']}%")
-                st.write(f"⏳ Maturity Period: {row['Maturity_Period']}")
-                st.write(f"💰 Price: ${row['Price']} per kg")
-                st.write(f"📦 Minimum Order: {row['Min_Order']} kg")
-            
-            with col3:
-                if st.button("Send Order Inquiry", key=f"inquiry_{row['Seed']}"):
-                    handle_inquiry_click()
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+    # Display only the current page of the catalog
+    offset, limit = page_window('public_catalog', len(products))
+    for row in products[offset:offset + limit]:
+        st.markdown(f'<div class="catalog-container">', unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.image(get_image_store().thumbnail(row['Image'], row['Seed']), width=150)
+        with col2:
+            st.markdown(f'<div class="sub-title">{row["Seed"]}</div>', unsafe_allow_html=True)
+            st.write(row['Description'])
+            st.write(f"🌱 Germination Rate: {row['Germination_Rate']}%")
+            st.write(f"⏳ Maturity Period: {row['Maturity_Period']}")
+            st.write(f"💰 Price: ${row['Price']} per kg")
+            st.write(f"📦 Minimum Order: {row['Min_Order']} kg")
+        
+        with col3:
+            if st.button("Send Order Inquiry", key=f"inquiry_{row['SeedId']}"):
+                handle_inquiry_click()
+        
+        st.markdown('</div>', unsafe_allow_html=True)
 
 def handle_inquiry_click():
     """Handle click on inquiry button."""
@@ -539,31 +527,8 @@ def show_sidebar():
     with st.sidebar:
         st.write(f"Welcome, {st.session_state.user_name}!")
         
-        # Role-specific navigation
-        if st.session_state.user_role == 'customer':
-            st.sidebar.title("Navigation")
-            if st.sidebar.button("📗 Catalog"):
-                st.session_state.current_page = 'catalog'
-            if st.sidebar.button("🛒 My Cart"):
-                st.session_state.current_page = 'cart'
-            if st.sidebar.button("📦 Order Tracking"):
-                st.session_state.current_page = 'tracking'
-            if st.sidebar.button("🔔 Notifications"):
-                st.session_state.current_page = 'notification_customer'
-                
-        elif st.session_state.user_role == 'marketing':
-            st.sidebar.title("Marketing")
-            if st.sidebar.button("📊 Dashboard"):
-                st.session_state.current_page = 'dashboard'
-            if st.sidebar.button("🔔 Notifications"):
-                st.session_state.current_page = 'marketing_notifications'
-                
-        elif st.session_state.user_role == 'production':
-            st.sidebar.title("Production")
-            if st.sidebar.button("📋 Dashboard"):
-                st.session_state.current_page = 'dashboard'
-            if st.sidebar.button("🔔 Notifications"):
-                st.session_state.current_page = 'production_notifications'
+        # Role-specific navigation, with badges that refresh on their own
+        show_sidebar_navigation()
         
         # Logout button
         if st.sidebar.button("Logout"):
@@ -573,6 +538,36 @@ def show_sidebar():
             st.session_state.current_page = 'landing'
             st.rerun()
 
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+def show_sidebar_navigation():
+    """Navigation buttons; only this fragment reruns to pick up new notifications for the badges."""
+    sync_inbox()
+    role = st.session_state.user_role
+    
+    def nav_button(label, page_id):
+        count = get_notification_count(role, page_id) if 'notification' in page_id else 0
+        if st.button(f"{label} ({count})" if count > 0 else label, key=f"sidebar_{page_id}"):
+            st.session_state.current_page = page_id
+            # A click only reruns this fragment; the page needs the whole app
+            st.rerun()
+    
+    if role == 'customer':
+        st.title("Navigation")
+        nav_button("📗 Catalog", 'catalog')
+        nav_button("🛒 My Cart", 'cart')
+        nav_button("📦 Order Tracking", 'tracking')
+        nav_button("🔔 Notifications", 'notification_customer')
+            
+    elif role == 'marketing':
+        st.title("Marketing")
+        nav_button("📊 Dashboard", 'dashboard')
+        nav_button("🔔 Notifications", 'marketing_notifications')
+            
+    elif role == 'production':
+        st.title("Production")
+        nav_button("📋 Dashboard", 'dashboard')
+        nav_button("🔔 Notifications", 'production_notifications')
+
 def show_signup():
     # Add return button at the top left
     if st.button("← Return to Home", key="return_login"):
@@ -768,7 +763,7 @@ def create_customer_account(email, password, company_name, company_registration,
             'address': address,
             'document_paths': doc_paths,
             'status': 'pending_verification',
-            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'created_at': time.time(),
             'verified_at': None,
             'role': 'customer'
         }
@@ -795,7 +790,7 @@ def create_customer_account(email, password, company_name, company_registration,
             'customer_id': customer_id,
             'company_name': company_name,
             'email': email,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'timestamp': time.time(),
             'status': 'pending'
         })
         
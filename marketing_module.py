@@ -1,7 +1,11 @@
 import streamlit as st
-from datetime import datetime
 import pandas as pd
-from notification import create_notification,show_do_notifications
+from notification import mark_seen, show_do_notifications, transition_orders
+from order_store import OrderConflictError, get_order_store
+from order_workflow import ORDER_STATUS, STATUS_LABELS, can_transition
+from models import format_timestamp
+from pagination import page_window
+from bulk_actions import select_orders
 
 def format_order_id(order_id):
     """Format the order ID to display only the first 8 characters."""
@@ -41,326 +45,275 @@ def show_payment_approvals():
     
     # Filter orders that need payment review - updated status name
     payment_review_orders = [
-        order for order in st.session_state.orders 
-        if (order.get('status') == 'pending_payment_approval' and order.get('payment_term') is not None) 
+        order for order in get_order_store().list_orders(status=ORDER_STATUS['PENDING_PAYMENT_APPROVAL'])
+        if order.payment_term is not None
     ]
     
     if not payment_review_orders:
         st.info("No payment terms pending review")
         return
     
+    # Apply one decision to many orders in a single write and a single rerun
+    with st.expander("Bulk actions"):
+        selected_orders = select_orders(payment_review_orders, key="bulk_payment_terms")
+        bulk_rejection_reason = st.text_area("Rejection Reason (for rejected orders)", key="bulk_reject_reason")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Approve selected", key="bulk_approve_terms", disabled=not selected_orders):
+                try:
+                    approve_payment_terms_bulk(selected_orders)
+                except OrderConflictError as e:
+                    st.warning(str(e))
+                else:
+                    st.rerun()
+        with col2:
+            if st.button("Reject selected", key="bulk_reject_terms", disabled=not selected_orders):
+                try:
+                    reject_payment_terms_bulk(selected_orders, bulk_rejection_reason)
+                except OrderConflictError as e:
+                    st.warning(str(e))
+                else:
+                    st.rerun()
+    
     for order in payment_review_orders:
-        with st.expander(f"Order #{format_order_id(order['order_id'])} - Payment Terms Review"):
+        with st.expander(f"Order #{format_order_id(order.order_id)} - Payment Terms Review"):
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                st.write(f"**Customer:** {order['contact_name']}")
-                st.write(f"**Company:** {order['company_name']}")
-                st.write(f"**Total Amount:** ${order.get('total', 0):,.2f}")
-                st.write(f"**Requested Payment Terms:** {order.get('payment_term', 'Not specified')}")
+                st.write(f"**Customer:** {order.contact_name}")
+                st.write(f"**Company:** {order.company_name}")
+                st.write(f"**Total Amount:** ${order.total:,.2f}")
+                st.write(f"**Requested Payment Terms:** {order.payment_term or 'Not specified'}")
                 
                 # Additional customer information
                 st.write("**Customer History:**")
-                st.write(f"Previous Orders: {order.get('previous_orders_count', 0)}")
-                st.write(f"Payment History Rating: {order.get('payment_rating', 'N/A')}")
+                st.write(f"Previous Orders: {order.previous_orders_count}")
+                st.write(f"Payment History Rating: {order.payment_rating or 'N/A'}")
             
             with col2:
                 review_decision = st.radio(
                     "Payment Terms Decision",
                     ["Approve", "Reject"],
-                    key=f"decision_{order['order_id']}"
+                    key=f"decision_{order.order_id}"
                 )
                 
                 if review_decision == "Reject":
                     rejection_reason = st.text_area(
                         "Rejection Reason",
-                        key=f"reject_reason_{order['order_id']}"
+                        key=f"reject_reason_{order.order_id}"
                     )
                 
-                if st.button("Submit Decision", key=f"submit_{order['order_id']}"):
-                    if review_decision == "Approve":
-                        approve_payment_terms(order)
+                if st.button("Submit Decision", key=f"submit_{order.order_id}"):
+                    # Two reviewers may decide the same order; only the first decision applies
+                    try:
+                        if review_decision == "Approve":
+                            approve_payment_terms(order)
+                        else:
+                            reject_payment_terms(order, rejection_reason)
+                    except OrderConflictError as e:
+                        st.warning(str(e))
                     else:
-                        reject_payment_terms(order, rejection_reason)
-                    st.rerun()
+                        st.rerun()
+    mark_seen(payment_review_orders)
 
 def approve_payment_terms(order):
-    # Update order status
-    for idx, o in enumerate(st.session_state.orders):
-        if o['order_id'] == order['order_id']:
-            st.session_state.orders[idx]['status'] = 'payment_terms_approved'
-            st.session_state.orders[idx]['payment_approval_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Payment Terms Approved',
-                'message': 'Your payment terms have been approved. Please proceed with payment.'
-            })
-    
-    # Create notification for customer
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='payment_terms',
-        title='Payment Terms Approved',
-        message=f"Payment terms for order #{order['order_id']} have been approved. Please proceed with payment.",
-        priority='high',
-        recipient='customer'
-    )
+    approve_payment_terms_bulk([order])
+
+def approve_payment_terms_bulk(orders):
+    # Update order statuses, add tracking updates and notify customers in one write
+    transition_orders(orders, 'PaymentTermsApproved')
 
 def reject_payment_terms(order, reason):
-    # Update order status
-    for idx, o in enumerate(st.session_state.orders):
-        if o['order_id'] == order['order_id']:
-            st.session_state.orders[idx]['status'] = 'payment_terms_rejected'
-            st.session_state.orders[idx]['rejection_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            st.session_state.orders[idx]['rejection_reason'] = reason
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Payment Terms Rejected',
-                'message': f'Payment terms rejected: {reason}'
-            })
-    
-    # Create notification for customer
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='payment_terms',
-        title='Payment Terms Review - Action Required',
-        message=f"Payment terms for order #{order['order_id']} require revision. Reason: {reason}. Please contact customer support for assistance.",
-        priority='high',
-        recipient='customer'
-    )
+    reject_payment_terms_bulk([order], reason)
+
+def reject_payment_terms_bulk(orders, reason):
+    # Update order statuses, add tracking updates and notify customers in one write
+    transition_orders(orders, 'PaymentTermsRejected', changes={'rejection_reason': reason})
 
 def show_payment_verification():
     st.subheader("💰Payment Verification")
     
     # Filter orders that need payment verification
-    pending_payment_orders = [
-        order for order in st.session_state.orders 
-        if order.get('status') == 'payment_submitted'
-    ]
+    pending_payment_orders = get_order_store().list_orders(status=ORDER_STATUS['PAYMENT_SUBMITTED'])
     
     if not pending_payment_orders:
         st.info("No payments pending verification")
         return
+    
+    # Verify many payments in a single write and a single rerun
+    with st.expander("Bulk actions"):
+        selected_orders = select_orders(pending_payment_orders, key="bulk_payment_verification")
+        if st.button("Verify selected payments", key="bulk_verify", disabled=not selected_orders):
+            try:
+                verify_payment_bulk(selected_orders)
+            except OrderConflictError as e:
+                st.warning(str(e))
+            else:
+                st.success(f"{len(selected_orders)} payments verified successfully!")
+                st.rerun()
         
     for order in pending_payment_orders:
-        with st.expander(f"Order #{order['order_id']} - Payment Verification"):
+        with st.expander(f"Order #{order.order_id} - Payment Verification"):
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                st.write(f"**Customer:** {order['contact_name']}")
-                st.write(f"**Company:** {order['company_name']}")
-                st.write(f"**Total Amount:** ${order.get('payment_amount', 0):,.2f}")
-                st.write(f"**Payment Method:** {order.get('payment_method', 'Not specified')}")
-                st.write(f"**Payment Date:** {order.get('payment_timestamp', 'Not specified')}")
+                st.write(f"**Customer:** {order.contact_name}")
+                st.write(f"**Company:** {order.company_name}")
+                st.write(f"**Total Amount:** ${order.payment_amount or 0:,.2f}")
+                st.write(f"**Payment Method:** {order.payment_method or 'Not specified'}")
+                st.write(f"**Payment Date:** {format_timestamp(order.payment_timestamp) or 'Not specified'}")
                 
-                if 'payment_proof' in order:
+                if order.payment_proof:
                     st.write("**Payment Proof:**")
-                    st.image(order['payment_proof'], caption="Payment Proof Document")
+                    st.image(order.payment_proof, caption="Payment Proof Document")
             
             with col2:
                 verification_status = st.radio(
                     "Verification Status",
                     ["Verify Payment", "Request Clarification"],
-                    key=f"verify_{order['order_id']}"
+                    key=f"verify_{order.order_id}"
                 )
                 
                 if verification_status == "Request Clarification":
                     clarification_reason = st.text_area(
                         "Clarification Details",
-                        key=f"clarify_{order['order_id']}"
+                        key=f"clarify_{order.order_id}"
                     )
                 
-                if st.button("Submit Verification", key=f"submit_verify_{order['order_id']}"):
-                    if verification_status == "Verify Payment":
-                        verify_payment(order)
-                        st.success("Payment verified successfully!")
+                if st.button("Submit Verification", key=f"submit_verify_{order.order_id}"):
+                    try:
+                        if verification_status == "Verify Payment":
+                            verify_payment(order)
+                            st.success("Payment verified successfully!")
+                        else:
+                            request_payment_clarification(order, clarification_reason)
+                            st.success("Clarification request sent to customer!")
+                    except OrderConflictError as e:
+                        st.warning(str(e))
                     else:
-                        request_payment_clarification(order, clarification_reason)
-                        st.success("Clarification request sent to customer!")
-                    st.rerun()
+                        st.rerun()
+    mark_seen(pending_payment_orders)
 
 def verify_payment(order):
     """Verify payment and notify production to generate DO"""
-    # Update order status
-    for idx, o in enumerate(st.session_state.orders):
-        if o['order_id'] == order['order_id']:
-            st.session_state.orders[idx]['status'] = 'payment_verified'
-            st.session_state.orders[idx]['payment_verification_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Payment Verified',
-                'message': 'Payment has been verified. Order is being processed.'
-            })
-    
-    # Notify customer about payment verification
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='payment_status',
-        title='Payment Verified',
-        message=f"Payment for order #{order['order_id']} has been verified. Your order is being processed.",
-        priority='high',
-        recipient='customer'
-    )
-    
-    # Notify production to generate DO
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='do_request',
-        title='Generate Delivery Order',
-        message=f"Payment verified for order #{order['order_id']}. Please generate delivery order.",
-        priority='high',
-        recipient='production'
-    )
-
-def request_payment_clarification(order, reason):
-    # Update order status and add clarification request
-    for idx, o in enumerate(st.session_state.orders):
-        if o['order_id'] == order['order_id']:
-            st.session_state.orders[idx]['status'] = 'payment_clarification_required'
-            st.session_state.orders[idx]['clarification_reason'] = reason
-            st.session_state.orders[idx]['clarification_request_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Payment Clarification Required',
-                'message': f'Additional payment information required: {reason}'
-            })
-    
-    # Create notification for customer
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='payment_clarification',
-        title='Payment Clarification Required',
-        message=f"We need additional information about your payment for order #{order['order_id']}: {reason}",
-        priority='high',
-        recipient='customer'
-    )
+    verify_payment_bulk([order])
 
+def verify_payment_bulk(orders):
+    """Verify several payments in one write and notify production to generate DOs"""
+    transition_orders(orders, 'PaymentVerified')
 
-def update_order_status_for_payment_review(order, approved):
-    # Update status based on marketing team's decision
-    if approved:
-        order['status'] = 'payment_terms_approved'
-        message = 'Payment terms approved by marketing team'
-    else:
-        order['status'] = 'payment_terms_rejected'
-        message = 'Payment terms rejected by marketing team'
-
-    # Append to tracking updates
-    order['tracking_updates'].append({
-        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'status': order['status'],
-        'message': message
-    })
-
-    # Create a notification for the customer
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='payment_review',
-        title='Payment Review Update',
-        message=message,
-        priority='high',
-        recipient='customer'
-    )
+def request_payment_clarification(order, reason):
+    # Update order status, add clarification request and notify customer
+    transition_orders([order], 'PaymentClarificationRequested', changes={'clarification_reason': reason})
 
 def show_order_management():
     st.subheader("📋Order Management")
     
-    # Updated status filter options with clear labels
-    status_mapping = {
-        "All": "All",
-        "pending_payment_term": "Awaiting Payment Term Selection",
-        "pending_payment_approval": "Pending Payment Term Approval",
-        "payment_terms_approved": "Payment Terms Approved",
-        "payment_terms_rejected": "Payment Terms Rejected",
-        "payment_completed": "Payment Completed",
-        "ready_for_pickup": "Ready for Pickup",
-        "completed": "Order Completed",
-        "payment_submitted": "Payment Submitted",
-        "payment_verified": "Payment Verified",
-        "do_generated": "DO Generated",
-        "pending_production": "Pending Production",  # Added missing status
-        "in_production": "In Production",           # Added production-related status
-        "production_completed": "Production Completed"  # Added production-related status
-    }
+    # Status filter options with the workflow's labels
+    status_mapping = {"All": "All", **STATUS_LABELS}
     
-    status_filter = st.selectbox(
-        "Filter by Status",
-        list(status_mapping.keys()),
-        format_func=lambda x: status_mapping[x]
-    )
+    col1, col2 = st.columns(2)
+    with col1:
+        status_filter = st.selectbox(
+            "Filter by Status",
+            list(status_mapping.keys()),
+            format_func=lambda x: status_mapping[x]
+        )
+    with col2:
+        search_term = st.text_input("Search orders", placeholder="Order ID or Company name",
+                                    key="order_management_search")
     
-    # Filter orders based on selected status
-    if status_filter != "All":
-        filtered_orders = [order for order in st.session_state.orders if order['status'] == status_filter]
+    store = get_order_store()
+    status = None if status_filter == "All" else status_filter
+    if search_term.strip():
+        # Look the term up in the search index, then apply the status filter
+        filtered_orders = [
+            order for order in store.search_orders(search_term)
+            if status is None or order.status == status
+        ]
+        total = len(filtered_orders)
     else:
-        filtered_orders = st.session_state.orders
+        # Count the status bucket and fetch only the visible page below
+        filtered_orders = None
+        total = store.count_orders(status=status)
     
-    if not filtered_orders:
+    if not total:
         st.info("No orders found for the selected status.")
         return
     
-    for order in filtered_orders:
-        with st.expander(f"Order #{format_order_id(order['order_id'])} - {status_mapping[order['status']]}"):
+    offset, limit = page_window('order_management', total)
+    if filtered_orders is None:
+        page_orders = store.list_orders(status=status, offset=offset, limit=limit)
+    else:
+        page_orders = filtered_orders[offset:offset + limit]
+    
+    for order in page_orders:
+        with st.expander(f"Order #{format_order_id(order.order_id)} - {status_mapping.get(order.status, order.status)}"):
             col1, col2 = st.columns([3, 1])
             
             with col1:
-                st.write(f"**Customer:** {order['contact_name']}")
-                st.write(f"**Company:** {order['company_name']}")
-                st.write(f"**Order Date:** {order['date']}")
-                st.write(f"**Total Amount:** ${order.get('total', 0):,.2f}")
+                st.write(f"**Customer:** {order.contact_name}")
+                st.write(f"**Company:** {order.company_name}")
+                st.write(f"**Order Date:** {format_timestamp(order.date)}")
+                st.write(f"**Total Amount:** ${order.total:,.2f}")
                 
                 # Show order items
                 st.write("**Order Items:**")
-                for item in order['items']:
-                    st.write(f"- {item['seed']}: {item['quantity']}kg at ${item['price_per_kg']}/kg")
+                for item in order.items:
+                    st.write(f"- {item.seed}: {item.quantity}kg at ${item.price_per_kg}/kg")
                 
-                if order.get('special_instructions'):
+                if order.special_instructions:
                     st.write("**Special Instructions:**")
-                    st.write(order['special_instructions'])
+                    st.write(order.special_instructions)
             
             with col2:
                 # Actions based on order status
-                if order['status'] == 'pending_payment_approval':
-                    if st.button("Approve Payment", key=f"approve_payment_{order['order_id']}"):
-                        approve_payment_terms(order)
-                        st.success("Payment approved!")
-                        st.rerun()
-                    if st.button("Reject Payment", key=f"reject_payment_{order['order_id']}"):
-                        reject_payment_terms(order, "Reason for rejection")
-                        st.error("Payment rejected!")
-                        st.rerun()
-                elif order['status'] == 'payment_terms_approved':
+                if can_transition(order.status, 'PaymentTermsApproved'):
+                    if st.button("Approve Payment", key=f"approve_payment_{order.order_id}"):
+                        try:
+                            approve_payment_terms(order)
+                        except OrderConflictError as e:
+                            st.warning(str(e))
+                        else:
+                            st.success("Payment approved!")
+                            st.rerun()
+                    if st.button("Reject Payment", key=f"reject_payment_{order.order_id}"):
+                        try:
+                            reject_payment_terms(order, "Reason for rejection")
+                        except OrderConflictError as e:
+                            st.warning(str(e))
+                        else:
+                            st.error("Payment rejected!")
+                            st.rerun()
+                elif order.status == ORDER_STATUS['PAYMENT_TERMS_APPROVED']:
                     st.info("Payment terms approved. Awaiting payment.")
-                elif order['status'] == 'ready_for_pickup':
+                elif order.status == ORDER_STATUS['READY_FOR_PICKUP']:
                     st.success("Order is ready for pickup.")
-                elif order['status'] == 'completed':
+                elif order.status == ORDER_STATUS['COMPLETED']:
                     st.success("Order has been completed.")
-                elif order['status'] == 'payment_submitted':
+                elif order.status == ORDER_STATUS['PAYMENT_SUBMITTED']:
                     st.info("Payment has been submitted.")
-                elif order['status'] == 'payment_verified':
+                elif order.status == ORDER_STATUS['PAYMENT_VERIFIED']:
                     st.success("Payment has been verified.")
-                elif order['status'] == 'do_generated':
+                elif order.status == ORDER_STATUS['DO_GENERATED']:
                     st.info("Delivery Order has been generated.")
                 # Add more actions as needed for other statuses
+    mark_seen(page_orders)
 
 def show_order_details(order):
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.write(f"**Customer:** {order['contact_name']}")
-        st.write(f"**Company:** {order['company_name']}")
-        st.write(f"**Order Date:** {order['date']}")
-        st.write(f"**Total Amount:** ${order.get('total', 0):,.2f}")
+        st.write(f"**Customer:** {order.contact_name}")
+        st.write(f"**Company:** {order.company_name}")
+        st.write(f"**Order Date:** {format_timestamp(order.date)}")
+        st.write(f"**Total Amount:** ${order.total:,.2f}")
         
-        if order.get('payment_approval_date'):
-            st.write(f"**Payment Approval Date:** {order['payment_approval_date']}")
-        if order.get('rejection_date'):
-            st.write(f"**Rejection Date:** {order['rejection_date']}")
-            st.write(f"**Rejection Reason:** {order.get('rejection_reason', 'Not specified')}")
+        if order.payment_approval_date:
+            st.write(f"**Payment Approval Date:** {format_timestamp(order.payment_approval_date)}")
+        if order.rejection_date:
+            st.write(f"**Rejection Date:** {format_timestamp(order.rejection_date)}")
+            st.write(f"**Rejection Reason:** {order.rejection_reason or 'Not specified'}")
     
 
 
@@ -368,70 +321,52 @@ def show_customer_support():
     st.subheader("👥Customer Support")
     
     # Filter for orders with rejected payment terms
-    rejected_orders = [
-        order for order in st.session_state.orders
-        if order.get('status') == 'payment_terms_rejected'
-    ]
+    rejected_orders = get_order_store().list_orders(status=ORDER_STATUS['PAYMENT_TERMS_REJECTED'])
     
     if not rejected_orders:
         st.info("No rejected payment terms to review")
         return
     
     for order in rejected_orders:
-        with st.expander(f"Order #{order['order_id']} - Customer Support Required"):
+        with st.expander(f"Order #{order.order_id} - Customer Support Required"):
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                st.write(f"**Customer:** {order['contact_name']}")
-                st.write(f"**Company:** {order['company_name']}")
-                st.write(f"**Rejection Reason:** {order.get('rejection_reason', 'Not specified')}")
-                st.write(f"**Rejection Date:** {order.get('rejection_date', 'Not specified')}")
+                st.write(f"**Customer:** {order.contact_name}")
+                st.write(f"**Company:** {order.company_name}")
+                st.write(f"**Rejection Reason:** {order.rejection_reason or 'Not specified'}")
+                st.write(f"**Rejection Date:** {format_timestamp(order.rejection_date) or 'Not specified'}")
                 
-                # Support notes
-                support_notes = st.text_area(
-                    "Support Notes",
-                    value=order.get('support_notes', ''),
-                    key=f"support_notes_{order['order_id']}"
-                )
+                # Support notes; seeded once so a draft survives someone else saving
+                notes_key = f"support_notes_{order.order_id}"
+                if notes_key not in st.session_state:
+                    st.session_state[notes_key] = order.support_notes or ''
+                support_notes = st.text_area("Support Notes", key=notes_key)
             
             with col2:
-                if st.button("Update Support Notes", key=f"update_notes_{order['order_id']}"):
-                    update_support_notes(order['order_id'], support_notes)
-                    st.success("Support notes updated successfully!")
+                if st.button("Update Support Notes", key=f"update_notes_{order.order_id}"):
+                    try:
+                        update_support_notes(order, support_notes)
+                    except OrderConflictError as e:
+                        st.warning(str(e))
+                        st.caption(f"Saved notes: {order.support_notes or 'None'}")
+                    else:
+                        st.success("Support notes updated successfully!")
+                        st.rerun()
                 
-                if st.button("Resubmit for Review", key=f"resubmit_{order['order_id']}"):
-                    resubmit_payment_terms(order['order_id'])
-                    st.success("Order resubmitted for payment terms review!")
-
-def update_support_notes(order_id, notes):
-    for idx, order in enumerate(st.session_state.orders):
-        if order['order_id'] == order_id:
-            st.session_state.orders[idx]['support_notes'] = notes
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Support Notes Updated',
-                'message': 'Customer support notes have been updated.'
-            })
+                if st.button("Resubmit for Review", key=f"resubmit_{order.order_id}"):
+                    try:
+                        resubmit_payment_terms(order)
+                    except OrderConflictError as e:
+                        st.warning(str(e))
+                    else:
+                        st.success("Order resubmitted for payment terms review!")
+                        st.rerun()
+    mark_seen(rejected_orders)
 
-def resubmit_payment_terms(order_id):
-    for idx, order in enumerate(st.session_state.orders):
-        if order['order_id'] == order_id:
-            st.session_state.orders[idx]['status'] = 'pending_payment_approval'
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Payment Terms Resubmitted',
-                'message': 'Payment terms have been resubmitted for review.'
-            })
-            
-            # Create notification for marketing team
-            create_notification(
-                order_id=order_id,
-                notification_type='payment_terms',
-                title='Payment Terms Resubmission',
-                message=f"Order #{order_id} has been resubmitted for payment terms review after customer support intervention.",
-                priority='high',
-                recipient='marketing'
-            )
+def update_support_notes(order, notes):
+    transition_orders([order], 'SupportNotesUpdated', changes={'support_notes': notes})
 
+def resubmit_payment_terms(order):
+    # Send the order back to payment terms review and notify marketing team
+    transition_orders([order], 'PaymentTermsResubmitted')
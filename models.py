@@ -0,0 +1,158 @@
+# models.py
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+
+# Display format for timestamps; records store epoch seconds
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_timestamp(value):
+    """Return epoch seconds for a stored timestamp; older records hold formatted strings."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+
+
+def format_timestamp(timestamp, fmt=TIMESTAMP_FORMAT):
+    """Format epoch seconds for display."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).strftime(fmt)
+
+
+class Record:
+    """Shared (de)serialization for the slotted records below."""
+
+    __slots__ = ()
+
+    # Fields holding epoch seconds
+    timestamp_fields = ()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self._field_names()}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Ignore keys from older schemas so stored records keep loading
+        names = cls._field_names()
+        return cls(**cls.normalize({key: value for key, value in data.items() if key in names}))
+
+    @classmethod
+    def normalize(cls, data):
+        """Coerce timestamp fields in a dict of field values to epoch seconds."""
+        for name in cls.timestamp_fields:
+            if name in data:
+                data[name] = to_timestamp(data[name])
+        return data
+
+    @classmethod
+    def _field_names(cls):
+        names = cls.__dict__.get('_names')
+        if names is None:
+            names = frozenset(f.name for f in fields(cls))
+            setattr(cls, '_names', names)
+        return names
+
+
+@dataclass(slots=True)
+class CartItem(Record):
+    id: str
+    seed: str
+    quantity: int
+    price_per_kg: float
+    total_price: float
+
+
+@dataclass(slots=True)
+class TrackingUpdate(Record):
+    timestamp: float
+    status: str
+    message: str
+
+
+@dataclass(slots=True)
+class Notification(Record):
+    id: str
+    type: str
+    title: str
+    message: str
+    timestamp: float
+    order_id: str
+    priority: str = 'medium'
+    read: bool = False
+    # Notifications coalesced into this one as a digest, oldest first; empty when it stands alone
+    details: list = field(default_factory=list)
+
+    @property
+    def count(self):
+        return len(self.details) or 1
+
+    @property
+    def order_ids(self):
+        return [detail.order_id for detail in self.details] if self.details else [self.order_id]
+
+
+@dataclass(slots=True)
+class Order(Record):
+    timestamp_fields = (
+        'date', 'payment_approval_date', 'rejection_date', 'payment_timestamp',
+        'payment_verification_date', 'clarification_request_date', 'do_date'
+    )
+
+    order_id: str
+    date: float
+    items: list
+    total: float
+    company_name: str
+    contact_name: str
+    email: str
+    phone: str
+    courier_company: str
+    special_instructions: str = ''
+    customer_email: str = None  # Account that placed the order
+    version: int = 0  # Bumped by every event after submission
+    status: str = 'pending_production'
+    production_approved: bool = False
+    marketing_approved: bool = False
+    # Payment terms and payment
+    payment_status: str = 'pending'
+    payment_term: str = None
+    payment_details: dict = None
+    payment_approval_date: float = None
+    rejection_date: float = None
+    rejection_reason: str = None
+    payment_method: str = None
+    payment_timestamp: float = None
+    payment_amount: float = None
+    payment_verification_date: float = None
+    payment_proof: bytes = None
+    clarification_reason: str = None
+    clarification_request_date: float = None
+    support_notes: str = ''
+    # Delivery and pickup
+    do_number: str = None
+    do_date: float = None
+    delivery_order: dict = None
+    notification_read: bool = False
+    pickup_date: str = None
+    pickup_time: str = None
+    # Customer history shown to marketing
+    previous_orders_count: int = 0
+    payment_rating: str = None
+
+    def to_dict(self):
+        data = Record.to_dict(self)
+        data['items'] = [item.to_dict() for item in self.items]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        order = super(Order, cls).from_dict(data)
+        order.items = [
+            item if isinstance(item, CartItem) else CartItem.from_dict(item)
+            for item in order.items
+        ]
+        return order
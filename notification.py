@@ -1,59 +1,246 @@
 # notifications.py
 
 import uuid
-from datetime import datetime
+import time
+from dataclasses import replace
+from datetime import timedelta
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from order_store import OrderConflictError, get_order_store
+from order_workflow import ORDER_STATUS, notifications_for
+from models import Notification, format_timestamp
+from inbox import Inbox, RetentionPolicy
+from notification_archive import get_notification_archive
+from notification_bus import channel_for, get_notification_bus
 
 def format_order_id(order_id):
     """Format the order ID to display only the first 8 characters."""
     return order_id[:8]
 
 
-def create_notification(order_id, notification_type, title, message, priority='medium', recipient='none'):
-    """Creates a new notification for the specified recipient team and adds it to the session state."""
+# Session state inbox holding each recipient team's notifications
+NOTIFICATION_KEYS = {
+    'customer': 'notification_customer',
+    'production': 'production_notifications',
+    'marketing': 'marketing_notifications'
+}
+
+# Retention applied to every session's inbox, and seconds between compactions
+RETENTION = RetentionPolicy()
+COMPACT_INTERVAL = 60
+
+# Order IDs listed on a digest's card before "and N more"
+DIGEST_PREVIEW = 5
+
+# Notification cards shown at first, and added by each "Load more"
+NOTIFICATION_PAGE_SIZE = 25
+
+# Seconds between refreshes of the notification lists and sidebar badges
+NOTIFICATION_REFRESH_SECONDS = 10
+
+# How far before its last sync a session that the bus dropped as idle replays from
+SYNC_OVERLAP_SECONDS = 60
+
+
+def get_inbox(session_key):
+    """Return the inbox stored under a session key, creating it if needed."""
+    inbox = st.session_state.get(session_key)
+    if not isinstance(inbox, Inbox):
+        # Sessions started before inboxes were indexed hold plain lists
+        inbox = st.session_state[session_key] = Inbox(inbox or ())
+    return inbox
+
+
+def create_notification(order_id, notification_type, title, message, priority='medium', recipient='none', user=None):
+    """Publishes a new notification to the specified recipient team, or for customers to the order's customer."""
+    return create_notifications([{
+        'order_id': order_id,
+        'notification_type': notification_type,
+        'title': title,
+        'message': message,
+        'priority': priority,
+        'recipient': recipient,
+        'user': user
+    }])[0]
+
+def create_notifications(notifications):
+    """Publishes a batch of notifications, each a dict of create_notification's arguments.
+
+    Each notification goes once onto the notification bus, which delivers it to
+    every session subscribed to the recipient's channel. Customer notifications
+    go to the channel of `user`, defaulting to the order's customer. Receiving
+    inboxes coalesce bursts of the same notification into digests. Returns the
+    published notifications in order, with None for duplicates that were skipped.
+    """
+    bus = get_notification_bus()
+    created = []
+    timestamp = time.time()
+    for args in notifications:
+        recipient = args.get('recipient', 'none')
+        if recipient not in NOTIFICATION_KEYS:
+            raise KeyError(recipient)
+        user = args.get('user')
+        if recipient == 'customer' and user is None:
+            order = get_order_store().get_order(args['order_id'])
+            user = order.customer_email if order else None
+        
+        notification = Notification(
+            id=str(uuid.uuid4()),
+            type=args['notification_type'],
+            title=args['title'],
+            message=args['message'],
+            timestamp=timestamp,
+            order_id=args['order_id'],
+            priority=args.get('priority', 'medium')
+        )
+        # Only keep notifications the channel doesn't already have
+        created.append(notification if bus.publish(channel_for(recipient, user), notification) else None)
     
-    # Define the session key based on the recipient
-    session_key = {
-        'customer': 'notification_customer',
-        'production': 'production_notifications',
-        'marketing': 'marketing_notifications'
-    }.get(recipient)
+    # Show the producer's own session anything it just sent itself
+    sync_inbox()
+    return created
+
+def sync_inbox():
+    """Moves notifications published for the current user into their session's inbox.
+
+    The session subscribes to its user's channel on first use. When someone
+    else logs in on the same session the inbox starts empty and the new
+    user's channel is subscribed instead. Only notifications queued since the
+    last sync are touched, so this is cheap to call on every run.
+    """
+    bus = get_notification_bus()
+    role = st.session_state.get('user_role')
+    user = (role, st.session_state.get('user_email'))
+    subscription = st.session_state.get('notification_subscription')
+    channel = channel_for(*user) if role in NOTIFICATION_KEYS else None
     
-    # Initialize session state if not exists
-    if session_key and session_key not in st.session_state:
-        st.session_state[session_key] = []
+    if subscription and (subscription[0] != channel or st.session_state.get('notification_user') != user):
+        bus.unsubscribe(*subscription)
+        # The previous user's notifications must not carry over to whoever logs in next
+        reset_notifications(subscription[0][0])
+        subscription = st.session_state.notification_subscription = None
+    if channel is None:
+        return
+    if subscription is None:
+        subscription = (channel, str(uuid.uuid4()))
+        bus.subscribe(*subscription)
+        st.session_state.notification_subscription = subscription
+        st.session_state.notification_user = user
     
-    # Check for existing notification
-    existing_notification = any(
-        n['order_id'] == order_id and 
-        n['type'] == notification_type and 
-        n['title'] == title 
-        for n in st.session_state[session_key]
-    )
+    inbox = get_inbox(NOTIFICATION_KEYS[role])
+    synced_at = time.time()
+    notifications = bus.drain(*subscription)
+    if notifications is None:
+        # Dropped as idle; catch up from the channel history, which the inbox dedups
+        since = st.session_state.get('notification_synced_at', 0) - SYNC_OVERLAP_SECONDS
+        bus.subscribe(*subscription, since=since)
+        notifications = bus.drain(*subscription)
+    st.session_state.notification_synced_at = synced_at
+    for notification in notifications:
+        # Each session marks its own copy as read
+        inbox.add(replace(notification))
+    compact_inbox()
+
+def reset_notifications(role):
+    """Empties a role's inbox and forgets its paging and compaction state."""
+    st.session_state[NOTIFICATION_KEYS[role]] = Inbox()
+    for key in (f"{role}_notification_window", f"{role}_notification_cache", 'notification_compacted_at'):
+        st.session_state.pop(key, None)
+
+def archive_owner(channel):
+    """Name a channel's archived notifications are filed under."""
+    recipient, user = channel
+    return f"{recipient}:{user}" if user else recipient
+
+def compact_inbox(force=False):
+    """Evicts notifications outside RETENTION from the current user's inbox and archives them.
+
+    Runs at most once every COMPACT_INTERVAL seconds per session unless forced,
+    and the archive write happens on a background thread. Returns the evicted
+    notifications.
+    """
+    # The inbox holds what the subscribed channel delivered, so file it under that channel
+    subscription = st.session_state.get('notification_subscription')
+    if subscription is None:
+        return []
+    channel = subscription[0]
+    now = time.time()
+    if not force and now - st.session_state.get('notification_compacted_at', 0) < COMPACT_INTERVAL:
+        return []
+    st.session_state.notification_compacted_at = now
     
-    # Only create and add notification if it doesn't exist
-    if not existing_notification:
-        notification = {
-            'id': str(uuid.uuid4()),
-            'type': notification_type,
-            'title': title,
-            'message': message,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'read': False,
-            'order_id': order_id,
-            'priority': priority
-        }
-        st.session_state[session_key].append(notification)
-        return notification
-    return None
-
-def mark_as_read(notification_id):
+    inbox = get_inbox(NOTIFICATION_KEYS[channel[0]])
+    expired = inbox.expired(RETENTION, now)
+    if expired:
+        inbox.remove(expired)
+        get_notification_archive().archive_in_background(archive_owner(channel), expired)
+    return expired
+
+def show_archived_notifications(role):
+    """Search box over the current user's archived notifications."""
+    with st.expander("🗄️ Archived notifications"):
+        term = st.text_input("Search archived notifications", key=f"{role}_archive_search",
+                             placeholder="Order ID, title or message")
+        # The archive is only queried once there is something to search for
+        if not term.strip():
+            st.caption("Enter a search term to look through older notifications.")
+            return
+        channel = channel_for(role, st.session_state.get('user_email'))
+        archived = get_notification_archive().search(archive_owner(channel), term)
+        if not archived:
+            st.info("No archived notifications found.")
+        for notification in archived:
+            st.markdown(f"**{notification.title}** - {notification.message}")
+            st.caption(f"Order ID: {notification.order_id} | {format_timestamp(notification.timestamp)}")
+
+def seen_version(order):
+    """Version of an order as this session last showed it, or the version just read."""
+    return st.session_state.get(f"seen_version_{order.order_id}", order.version)
+
+def mark_seen(orders):
+    """Record the versions of orders shown on this run.
+
+    Call after rendering an order's controls: a click is handled on the next
+    run, after the order has been read again, so transition_orders checks it
+    against the version recorded here rather than the one just read. A
+    recorded version is never lowered, so a list read before this run's own
+    update can't undo it.
+    """
+    for order in orders:
+        key = f"seen_version_{order.order_id}"
+        if order.version > st.session_state.get(key, -1):
+            st.session_state[key] = order.version
+
+def transition_orders(orders, event, changes=None, message=None, label=None):
+    """Apply a workflow event to orders in one write and send the notifications
+    the workflow table lists for it.
+
+    Raises OrderConflictError, sending nothing, if any order changed since this
+    session last showed it.
+    """
+    store = get_order_store()
+    try:
+        updated = store.update_orders(
+            [(order.order_id, event, changes, message, label) for order in orders],
+            expected_versions={order.order_id: seen_version(order) for order in orders}
+        )
+    except OrderConflictError as e:
+        # The rest of this run shows the latest state, so a deliberate retry goes through
+        mark_seen(store.get_order(order_id) for order_id in e.order_ids)
+        raise
+    mark_seen(updated)
+    create_notifications([
+        notification
+        for order in updated
+        for notification in notifications_for(event, order)
+    ])
+    return updated
+
+def mark_as_read(notification_id, session_key='notification_customer'):
     """Marks a notification as read."""
-    for notification in st.session_state.notification_customer:
-        if notification['id'] == notification_id:
-            notification['read'] = True
-            return True
-    return False
+    inbox = get_inbox(session_key)
+    notification = inbox.get(notification_id)
+    return notification is not None and inbox.mark_read(notification)
 
 def get_priority_icon(priority):
     """Returns the appropriate icon for notification priority"""
@@ -64,11 +251,9 @@ def get_priority_icon(priority):
     }
     return icons.get(priority.lower(), '')
 
-def get_relative_time(timestamp_str):
-    """Returns a human-readable relative time string."""
-    timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-    now = datetime.now()
-    delta = now - timestamp
+def get_relative_time(timestamp):
+    """Returns a human-readable relative time string for epoch seconds."""
+    delta = timedelta(seconds=time.time() - timestamp)
     
     if delta.days > 0:
         return f"{delta.days} day{'s' if delta.days != 1 else ''} ago"
@@ -91,13 +276,83 @@ def get_notification_badge(notification_type):
     return type_labels.get(notification_type, notification_type)
 
 
-def filter_notifications(notifications, filter_read, filter_priority):
-    if filter_read != "All":
-        is_read = filter_read == "Read"
-        notifications = [n for n in notifications if n.get('read', False) == is_read]
-    if filter_priority != "All":
-        notifications = [n for n in notifications if n.get('priority', 'normal').lower() == filter_priority.lower()]
-    return notifications
+def notification_text(notification):
+    """Card message; a digest summarizes the orders it covers."""
+    if not notification.details:
+        return notification.message
+    shown = ', '.join(f"#{format_order_id(order_id)}" for order_id in notification.order_ids[:DIGEST_PREVIEW])
+    more = notification.count - DIGEST_PREVIEW
+    return f"{notification.count} updates for orders {shown}" + (f" and {more} more" if more > 0 else "")
+
+def order_label(notification):
+    if notification.details:
+        return f"{notification.count} orders"
+    return f"Order ID: {notification.order_id}"
+
+def show_digest_details(notification):
+    """Expander listing each notification coalesced into a digest."""
+    if not notification.details:
+        return
+    with st.expander(f"Show all {notification.count} updates"):
+        for detail in reversed(notification.details):
+            st.markdown(
+                f"- **#{format_order_id(detail.order_id)}** {detail.message} "
+                f"({get_relative_time(detail.timestamp)})"
+            )
+
+def notification_filters(filter_read="All", filter_priority="All", filter_category="All"):
+    """Inbox query arguments for a notification page's filter selections."""
+    return {
+        'read': None if filter_read == "All" else filter_read == "Read",
+        'priority': None if filter_priority == "All" else filter_priority,
+        'notification_type': None if filter_category == "All" else filter_category
+    }
+
+def notification_window(view, inbox, filters):
+    """Returns the notifications a page shows, newest first, and whether older ones remain.
+
+    A page starts with NOTIFICATION_PAGE_SIZE cards and each "Load more"
+    extends the window down to an older cursor, so only the window is read
+    from the inbox. Changing a filter starts again from the first page.
+    """
+    key = f"{view}_notification_window"
+    window = st.session_state.get(key)
+    if window is None or window[0] != filters:
+        window = st.session_state[key] = (filters, None)
+    
+    # Periodic refreshes reuse the last query until the inbox changes
+    since = window[1]
+    query = (filters, since, id(inbox), inbox.version)
+    cached = st.session_state.get(f"{view}_notification_cache")
+    if cached and cached[0] == query:
+        return cached[1]
+    
+    if since is None:
+        result = inbox.page(limit=NOTIFICATION_PAGE_SIZE, **filters)
+    else:
+        result = inbox.page(since=since, **filters)
+    st.session_state[f"{view}_notification_cache"] = (query, result)
+    return result
+
+def show_load_more(view, inbox, filters, notifications, more):
+    """Shows a "Load more" button that extends the window by the next page of older notifications."""
+    if not more:
+        return
+    if st.button("Load more", key=f"{view}_load_more"):
+        older, _ = inbox.page(
+            limit=NOTIFICATION_PAGE_SIZE, before=inbox.cursor(notifications[-1]), **filters
+        )
+        if older:
+            st.session_state[f"{view}_notification_window"] = (filters, inbox.cursor(older[-1]))
+        rerun_fragment()
+
+def rerun_fragment():
+    """Reruns just the notification list after a change, or the whole app when
+    the list is being drawn as part of a full run."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
 def add_notification_styles():
     st.markdown("""
@@ -132,10 +387,17 @@ def show_notifications_customer():
     """Displays the notifications interface for customers."""
     add_notification_styles()
     st.title("🔔 Customer Notifications")
+    show_archived_notifications('customer')
+    show_customer_notification_list()
+
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+def show_customer_notification_list():
+    """Notification cards; refreshes on its own so new notifications appear without a page rerun."""
+    sync_inbox()
     
     # Initialize if not exists
     if 'notification_customer' not in st.session_state:
-        st.session_state.notification_customer = []
+        st.session_state.notification_customer = Inbox()
     
     if not st.session_state.notification_customer:
         st.info("You have no notifications.")
@@ -162,56 +424,54 @@ def show_notifications_customer():
             key="customer_category_filter"
         )
     
-    # Apply filters
-    filtered_notifications = filter_notifications(
-        st.session_state.notification_customer,
-        filter_read,
-        filter_priority
-    )
-    
-    # Filter by category
-    if filter_category != "All":
-        filtered_notifications = [n for n in filtered_notifications if n['type'] == filter_category]
-    
-    # Sort notifications by timestamp (newest first)
-    filtered_notifications.sort(
-        key=lambda x: datetime.strptime(x['timestamp'], "%Y-%m-%d %H:%M:%S"),
-        reverse=True
-    )
+    # Apply filters; the inbox yields newest first, one page at a time
+    inbox = get_inbox('notification_customer')
+    filters = notification_filters(filter_read, filter_priority, filter_category)
+    filtered_notifications, more = notification_window('customer', inbox, filters)
     
     # Display notifications
     for idx, notification in enumerate(filtered_notifications):
-        read_class = 'notification-read' if notification['read'] else 'notification-unread'
-        priority_class = f"notification-{notification['priority']}"
+        read_class = 'notification-read' if notification.read else 'notification-unread'
+        priority_class = f"notification-{notification.priority}"
         
         st.markdown(
             f"""
             <div class="notification-card {read_class} {priority_class}">
-                <div class="notification-badge badge-{notification['type']}">
-                    {get_notification_badge(notification['type'])}
+                <div class="notification-badge badge-{notification.type}">
+                    {get_notification_badge(notification.type)}
                 </div>
                 <div class="notification-title">
-                    {get_priority_icon(notification['priority'])} {notification['title']}
+                    {get_priority_icon(notification.priority)} {notification.title}
                 </div>
-                <div class="notification-message">{notification['message']}</div>
+                <div class="notification-message">{notification_text(notification)}</div>
                 <div class="notification-time">
-                    Order ID: {notification['order_id']} | {get_relative_time(notification['timestamp'])}
+                    {order_label(notification)} | {get_relative_time(notification.timestamp)}
                 </div>
             </div>
             """,
             unsafe_allow_html=True
         )
+        show_digest_details(notification)
         
-        if not notification['read']:
+        if not notification.read:
             col1, col2 = st.columns([1, 4])
             with col1:
-                if st.button("Mark as Read", key=f"customer_read_{notification['id']}_{idx}"):
-                    notification['read'] = True
-                    st.rerun()
+                if st.button("Mark as Read", key=f"customer_read_{notification.id}_{idx}"):
+                    inbox.mark_read(notification)
+                    rerun_fragment()
+    
+    show_load_more('customer', inbox, filters, filtered_notifications, more)
                     
 def show_production_notifications():
     add_notification_styles() 
     st.title("🔔 Production Notifications")
+    show_archived_notifications('production')
+    show_production_notification_list()
+
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+def show_production_notification_list():
+    """Production's notification cards, redrawn every NOTIFICATION_REFRESH_SECONDS."""
+    sync_inbox()
 
     if not st.session_state.production_notifications:
         st.info("No notifications to display")
@@ -230,51 +490,60 @@ def show_production_notifications():
             key="production_category_filter"
         )
 
-    notifications = filter_notifications(st.session_state.production_notifications, filter_read, filter_priority)
-
-    # Filter by category
-    if filter_category != "All":
-        notifications = [n for n in notifications if n['type'] == filter_category]
+    # Newest first, like the other notification pages, one page at a time
+    inbox = get_inbox('production_notifications')
+    filters = notification_filters(filter_read, filter_priority, filter_category)
+    notifications, more = notification_window('production', inbox, filters)
 
     # Display notifications
     for idx, notification in enumerate(notifications):
         # Assign classes based on read status and priority
-        read_class = 'notification-read' if notification['read'] else 'notification-unread'
-        priority_class = f'notification-{notification["priority"].lower()}'
+        read_class = 'notification-read' if notification.read else 'notification-unread'
+        priority_class = f'notification-{notification.priority.lower()}'
 
         # Use a container for each notification
         with st.container():
             st.markdown(
                 f"""
                 <div class="notification-card {read_class} {priority_class}">
-                    <div class="notification-badge badge-{notification['type']}">
-                        {get_notification_badge(notification['type'])}
+                    <div class="notification-badge badge-{notification.type}">
+                        {get_notification_badge(notification.type)}
                     </div>
-                    <div class="notification-title">{notification['title']}</div>
-                    <div class="notification-message">{notification['message']}</div>
-                    <div class="notification-time">{notification['timestamp']}</div>
+                    <div class="notification-title">{notification.title}</div>
+                    <div class="notification-message">{notification_text(notification)}</div>
+                    <div class="notification-time">{format_timestamp(notification.timestamp)}</div>
                     <div class="notification-actions">
-                        {'<span>' + ('🔴' if notification['priority'].lower() == 'high' else '🟡' if notification['priority'].lower() == 'normal' else '🟢') + '</span>'}
+                        {'<span>' + ('🔴' if notification.priority.lower() == 'high' else '🟡' if notification.priority.lower() == 'normal' else '🟢') + '</span>'}
                     </div>
                 </div>
                 """,
                 unsafe_allow_html=True
             )
+            show_digest_details(notification)
 
-            if not notification['read'] and st.button("Mark as Read", key=f"read_{idx}"):
-                notification['read'] = True
-                st.rerun()
+            if not notification.read and st.button("Mark as Read", key=f"read_{notification.id}"):
+                inbox.mark_read(notification)
+                rerun_fragment()
 
             st.divider()  # Adds a visual divider between notifications
 
+    show_load_more('production', inbox, filters, notifications, more)
+
 def show_marketing_notifications():
     """Displays the notifications interface for marketing team."""
     add_notification_styles()
     st.title("🔔 Marketing Notifications")
+    show_archived_notifications('marketing')
+    show_marketing_notification_list()
+
+@st.fragment(run_every=NOTIFICATION_REFRESH_SECONDS)
+def show_marketing_notification_list():
+    """Marketing's notification cards, redrawn on the same timer as the customer list."""
+    sync_inbox()
     
     # Initialize marketing notifications if not exists
     if 'marketing_notifications' not in st.session_state:
-        st.session_state.marketing_notifications = []
+        st.session_state.marketing_notifications = Inbox()
     
     if not st.session_state.marketing_notifications:
         st.info("No marketing notifications to display")
@@ -284,9 +553,8 @@ def show_marketing_notifications():
     col1, col2 = st.columns([1, 3])
     with col1:
         if st.button("Mark all as read"):
-            for notification in st.session_state.marketing_notifications:
-                notification['read'] = True
-            st.rerun()
+            get_inbox('marketing_notifications').mark_all_read()
+            rerun_fragment()
     
     # Filtering options
     col1, col2, col3 = st.columns(3)
@@ -309,82 +577,54 @@ def show_marketing_notifications():
             key="marketing_category_filter"
         )
     
-    # Apply filters
-    filtered_notifications = filter_notifications(
-        st.session_state.marketing_notifications,
-        filter_read,
-        filter_priority
-    )
-    
-    # Filter by category
-    if filter_category != "All":
-        filtered_notifications = [n for n in filtered_notifications if n['type'] == filter_category]
-    
-    # Sort notifications by timestamp (newest first)
-    filtered_notifications.sort(
-        key=lambda x: datetime.strptime(x['timestamp'], "%Y-%m-%d %H:%M:%S"),
-        reverse=True
-    )
+    # Apply filters; the inbox yields newest first, one page at a time
+    inbox = get_inbox('marketing_notifications')
+    filters = notification_filters(filter_read, filter_priority, filter_category)
+    filtered_notifications, more = notification_window('marketing', inbox, filters)
     
     # Display notifications
     for idx, notification in enumerate(filtered_notifications):
-        read_class = 'notification-read' if notification['read'] else 'notification-unread'
-        priority_class = f"notification-{notification['priority']}"
+        read_class = 'notification-read' if notification.read else 'notification-unread'
+        priority_class = f"notification-{notification.priority}"
         
         st.markdown(
             f"""
             <div class="notification-card {read_class} {priority_class}">
-                <div class="notification-badge badge-{notification['type']}">
-                    {get_notification_badge(notification['type'])}
+                <div class="notification-badge badge-{notification.type}">
+                    {get_notification_badge(notification.type)}
                 </div>
                 <div class="notification-title">
-                    {get_priority_icon(notification['priority'])} {notification['title']}
+                    {get_priority_icon(notification.priority)} {notification.title}
                 </div>
-                <div class="notification-message">{notification['message']}</div>
+                <div class="notification-message">{notification_text(notification)}</div>
                 <div class="notification-time">
-                    Order ID: {notification['order_id']} | {get_relative_time(notification['timestamp'])}
+                    {order_label(notification)} | {get_relative_time(notification.timestamp)}
                 </div>
             </div>
             """,
             unsafe_allow_html=True
         )
+        show_digest_details(notification)
         
-        if not notification['read']:
+        if not notification.read:
             col1, col2 = st.columns([1, 4])
             with col1:
-                if st.button("Mark as Read", key=f"marketing_read_{notification['id']}_{idx}"):
-                    notification['read'] = True
-                    st.rerun()
+                if st.button("Mark as Read", key=f"marketing_read_{notification.id}_{idx}"):
+                    inbox.mark_read(notification)
+                    rerun_fragment()
         
         # Add a divider between notifications
         if idx < len(filtered_notifications) - 1:
             st.divider()
     
+    show_load_more('marketing', inbox, filters, filtered_notifications, more)
+    
     # Add space between categories
     st.markdown("<br>", unsafe_allow_html=True)
 
 def notify_customer_pickup(order):
     """Notify customer about DO and pickup availability"""
-    # Update order status
-    for idx, o in enumerate(st.session_state.orders):
-        if o['order_id'] == order['order_id']:
-            st.session_state.orders[idx]['status'] = 'ready_for_pickup'
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'Ready for Pickup',
-                'message': f'Order is ready for pickup. DO Number: {order["do_number"]}'
-            })
-    
-    # Create notification for customer
-    create_notification(
-        order_id=order['order_id'],
-        notification_type='pickup',
-        title='Order Ready for Pickup',
-        message=f"Your order #{order['order_id']} is ready for pickup. DO Number: {order['do_number']}. Please schedule your pickup time.",
-        priority='high',
-        recipient='customer'
-    )
+    transition_orders([order], 'ReadyForPickup')
 
 
 def show_do_notifications():
@@ -393,20 +633,17 @@ def show_do_notifications():
     st.subheader("📋 Delivery Order Notifications")
     
     # Filter orders with generated DOs that haven't been notified to customers
-    do_orders = [
-        order for order in st.session_state.orders 
-        if order.get('status') == 'do_generated'
-    ]
+    do_orders = get_order_store().list_orders(status=ORDER_STATUS['DO_GENERATED'])
     
     if not do_orders:
         st.info("No pending DO notifications")
         return
     
     for order in do_orders:
-        with st.expander(f"Order #{format_order_id(order['order_id'])} - DO #{order.get('do_number', 'N/A')}"):
-            st.write(f"**Customer:** {order['contact_name']}")
-            st.write(f"**Company:** {order['company_name']}")
-            st.write(f"**DO Generated Date:** {order.get('do_date', 'N/A')}")
+        with st.expander(f"Order #{format_order_id(order.order_id)} - DO #{order.do_number or 'N/A'}"):
+            st.write(f"**Customer:** {order.contact_name}")
+            st.write(f"**Company:** {order.company_name}")
+            st.write(f"**DO Generated Date:** {format_timestamp(order.do_date) or 'N/A'}")
             
             # Add DO review functionality here
             st.write("**Review DO Details:**")
@@ -414,18 +651,23 @@ def show_do_notifications():
             st.write("- Check order items and quantities")
             st.write("- Confirm DO number and date")
             
-            if st.button("Approve and Notify Customer", key=f"notify_{order['order_id']}"):
-                notify_customer_pickup(order)
-                st.success("DO approved and customer notified successfully!")
-                st.rerun()
+            if st.button("Approve and Notify Customer", key=f"notify_{order.order_id}"):
+                try:
+                    notify_customer_pickup(order)
+                except OrderConflictError as e:
+                    st.warning(str(e))
+                else:
+                    st.success("DO approved and customer notified successfully!")
+                    st.rerun()
+    mark_seen(do_orders)
 
 def initialize_notifications():
     """Initialize all notification-related session state variables."""
     if 'marketing_notifications' not in st.session_state:
-        st.session_state.marketing_notifications = []
+        st.session_state.marketing_notifications = Inbox()
     
     if 'production_notifications' not in st.session_state:
-        st.session_state.production_notifications = []
+        st.session_state.production_notifications = Inbox()
     
     if 'notification_customer' not in st.session_state:
-        st.session_state.notification_customer = []
\ No newline at end of file
+        st.session_state.notification_customer = Inbox()
\ No newline at end of file
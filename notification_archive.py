@@ -0,0 +1,110 @@
+# notification_archive.py
+import threading
+
+import streamlit as st
+
+from database import ConnectionPool
+from models import Notification
+from order_store import DB_PATH
+
+# Archived notifications returned by one search
+SEARCH_LIMIT = 50
+
+
+class NotificationArchive:
+    """Cold storage for notifications that retention moved out of session inboxes.
+
+    Notifications are filed under their owner, the channel name of the user or
+    team that received them, and stay searchable from the notification pages.
+    A notification archived by several sessions of the same owner is stored once.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._pool = ConnectionPool(db_path)
+        self._write_lock = threading.Lock()
+
+        with self._write_lock, self._pool.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS archived_notifications (
+                    owner TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    order_id TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    read INTEGER NOT NULL,
+                    PRIMARY KEY (owner, id)
+                );
+                CREATE INDEX IF NOT EXISTS archived_notifications_owner_time
+                    ON archived_notifications (owner, timestamp);
+            """)
+
+    def archive(self, owner, notifications):
+        """Store notifications under an owner in one transaction."""
+        if not notifications:
+            return
+        with self._write_lock, self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO archived_notifications "
+                    "(owner, id, type, title, message, timestamp, order_id, priority, read) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        # Digests are archived as the notifications they coalesced
+                        (owner, n.id, n.type, n.title, n.message, n.timestamp,
+                         n.order_id, n.priority, int(entry.read))
+                        for entry in notifications
+                        for n in entry.details or (entry,)
+                    ]
+                )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def archive_in_background(self, owner, notifications):
+        """Archive on a worker thread so the page render does not wait on the write."""
+        thread = threading.Thread(target=self.archive, args=(owner, list(notifications)), daemon=True)
+        thread.start()
+        return thread
+
+    def search(self, owner, term='', limit=SEARCH_LIMIT):
+        """Return an owner's archived notifications matching `term`, newest first.
+
+        The term is matched against the title, message and order ID.
+        """
+        query = "SELECT id, type, title, message, timestamp, order_id, priority, read " \
+                "FROM archived_notifications WHERE owner = ?"
+        params = [owner]
+        term = term.strip().lstrip('#')
+        if term:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            query += " AND (title LIKE ? ESCAPE '\\' OR message LIKE ? ESCAPE '\\' OR order_id LIKE ? ESCAPE '\\')"
+            params += [pattern, pattern, pattern]
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        with self._pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            Notification(
+                id=row[0], type=row[1], title=row[2], message=row[3], timestamp=row[4],
+                order_id=row[5], priority=row[6], read=bool(row[7])
+            )
+            for row in rows
+        ]
+
+    def count(self, owner):
+        with self._pool.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM archived_notifications WHERE owner = ?", (owner,)
+            ).fetchone()[0]
+
+
+@st.cache_resource
+def get_notification_archive():
+    """Return the notification archive shared by all sessions in this server process."""
+    return NotificationArchive()
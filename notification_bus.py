@@ -0,0 +1,140 @@
+# notification_bus.py
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from inbox import dedup_key
+
+# Notifications each channel keeps for sessions that subscribe later
+HISTORY_SIZE = 500
+# Undelivered notifications held per subscriber; sessions that went away stop growing here
+MAILBOX_SIZE = 500
+# Seconds without a drain after which a subscriber is taken for gone and dropped.
+# Open pages drain at least every NOTIFICATION_REFRESH_SECONDS through the sidebar.
+MAILBOX_IDLE_SECONDS = 15 * 60
+
+
+def channel_for(recipient, user=None):
+    """Channel a recipient's notifications are published on.
+
+    Customers each have their own channel, keyed by email; staff roles share one.
+    """
+    return (recipient, user if recipient == 'customer' else None)
+
+
+class _Mailbox:
+    __slots__ = ('notifications', 'drained_at')
+
+    def __init__(self, size):
+        self.notifications = deque(maxlen=size)
+        self.drained_at = time.monotonic()
+
+
+class _Channel:
+    __slots__ = ('history', 'keys', 'subscribers')
+
+    def __init__(self):
+        self.history = deque()
+        self.keys = set()
+        self.subscribers = {}  # subscriber_id -> _Mailbox
+
+
+class NotificationBus:
+    """In-process publish/subscribe for notifications, keyed by (role, user) channels.
+
+    A producer publishes a notification once; it is queued for every session
+    subscribed to the channel, and each session drains its own queue on its
+    next run. Recent notifications are kept per channel and replayed to new
+    subscribers, so a user who logs in afterwards still sees them.
+
+    Sessions end without saying so when a tab closes, so a subscriber that
+    hasn't drained for `idle_seconds` is dropped the next time its channel
+    publishes. drain() returns None for a dropped subscriber, which can then
+    subscribe again and replay what it missed from the history.
+
+    Nothing here depends on Streamlit, so a fresh NotificationBus() serves as a
+    local stand-in for the process-wide one in tests and scripts.
+    """
+
+    def __init__(self, history_size=HISTORY_SIZE, mailbox_size=MAILBOX_SIZE, idle_seconds=MAILBOX_IDLE_SECONDS):
+        self._lock = threading.Lock()
+        self._channels = {}
+        self.history_size = history_size
+        self.mailbox_size = mailbox_size
+        self.idle_seconds = idle_seconds
+
+    def _channel(self, channel):
+        state = self._channels.get(channel)
+        if state is None:
+            state = self._channels[channel] = _Channel()
+        return state
+
+    def publish(self, channel, notification):
+        """Deliver a notification to the channel's subscribers; returns False for a duplicate."""
+        key = dedup_key(notification.order_id, notification.type, notification.title)
+        with self._lock:
+            state = self._channel(channel)
+            if key in state.keys:
+                return False
+            if len(state.history) >= self.history_size:
+                oldest = state.history.popleft()
+                state.keys.discard(dedup_key(oldest.order_id, oldest.type, oldest.title))
+            state.history.append(notification)
+            state.keys.add(key)
+            idle_since = time.monotonic() - self.idle_seconds
+            for subscriber_id, mailbox in list(state.subscribers.items()):
+                if mailbox.drained_at < idle_since:
+                    del state.subscribers[subscriber_id]
+                else:
+                    mailbox.notifications.append(notification)
+            return True
+
+    def subscribe(self, channel, subscriber_id, replay=True, since=None):
+        """Start queueing a channel's notifications for a subscriber.
+
+        With `replay`, the channel's history is queued first, or only the
+        part timestamped at or after `since`.
+        """
+        with self._lock:
+            state = self._channel(channel)
+            mailbox = _Mailbox(self.mailbox_size)
+            if replay:
+                mailbox.notifications.extend(
+                    notification for notification in state.history
+                    if since is None or notification.timestamp >= since
+                )
+            state.subscribers[subscriber_id] = mailbox
+
+    def unsubscribe(self, channel, subscriber_id):
+        with self._lock:
+            state = self._channels.get(channel)
+            if state is not None:
+                state.subscribers.pop(subscriber_id, None)
+
+    def drain(self, channel, subscriber_id):
+        """Return and clear the notifications queued for a subscriber since its last drain.
+
+        Returns None if the subscriber isn't subscribed, e.g. after being dropped as idle.
+        """
+        with self._lock:
+            state = self._channels.get(channel)
+            mailbox = state and state.subscribers.get(subscriber_id)
+            if mailbox is None:
+                return None
+            mailbox.drained_at = time.monotonic()
+            notifications = list(mailbox.notifications)
+            mailbox.notifications.clear()
+            return notifications
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            state = self._channels.get(channel)
+            return len(state.subscribers) if state else 0
+
+
+@st.cache_resource
+def get_notification_bus():
+    """Return the notification bus shared by all sessions in this server process."""
+    return NotificationBus()
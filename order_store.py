@@ -0,0 +1,432 @@
+# order_store.py
+import json
+import os
+import threading
+from itertools import islice
+import time
+from dataclasses import replace
+from datetime import date, datetime
+
+import streamlit as st
+
+from database import ConnectionPool
+from indexes import SearchIndex, TimeIndex
+from models import Order, TrackingUpdate, to_timestamp
+from order_workflow import EVENTS, ORDER_STATUS, InvalidTransitionError, format_message, get_transition
+
+# Location of the shared order database; override with SEED_SALES_DB
+DB_PATH = os.environ.get(
+    'SEED_SALES_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed_sales.db')
+)
+
+# Number of events between materialized snapshots
+SNAPSHOT_INTERVAL = 500
+
+def _encode_value(value):
+    """Encode the non-JSON values that orders carry (payment due dates)."""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    raise TypeError(f"Cannot store value of type {type(value).__name__}")
+
+
+def _decode_value(obj):
+    """Inverse of _encode_value, used as the json object hook."""
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    if '__date__' in obj:
+        return date.fromisoformat(obj['__date__'])
+    return obj
+
+
+class OrderConflictError(Exception):
+    """Raised when an order changed after the caller read it."""
+
+    def __init__(self, order_ids):
+        self.order_ids = order_ids
+        orders = ', '.join(f"#{order_id[:8]}" for order_id in order_ids)
+        super().__init__(
+            f"Order {orders} was changed by someone else. Review its latest state and try again."
+        )
+
+
+def dumps(data):
+    return json.dumps(data, default=_encode_value)
+
+
+def loads(data):
+    return json.loads(data, object_hook=_decode_value)
+
+
+class OrderStore:
+    """Order book shared by every session, persisted to SQLite in WAL mode.
+
+    Every change is appended to the order_events log; the current state of
+    each order is a materialized view of that log. Every SNAPSHOT_INTERVAL
+    events the orders changed since the last snapshot are written to
+    order_snapshots, so a restart loads the snapshot and replays only the
+    tail of the log. The log also provides each order's tracking timeline.
+
+    Orders are held in memory in an order_id -> order index. A status ->
+    order IDs index lets work queues read only their own bucket, and order
+    IDs sorted by order date (overall and per customer account) answer date
+    range queries by binary search. A search index over order IDs and
+    company names serves the order search boxes. All are kept in sync on
+    every event. Writers are serialized through a lock and an immediate transaction;
+    each thread uses its own SQLite connection.
+
+    Every event is checked against the workflow table in order_workflow,
+    which sets the status it moves the order to and the fields it stamps
+    with the event time; a status can change only this way.
+
+    Returned orders are shared between sessions and must not be mutated in
+    place; change them through update_order(). Each event bumps the order's
+    version, so callers can pass the version they read as expected_version
+    and have the update rejected if someone else changed the order since.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._pool = ConnectionPool(db_path)
+        self._write_lock = threading.Lock()
+        self._orders = {}
+        # status -> {order_id: None}; dicts double as insertion-ordered sets
+        self._by_status = {}
+        # Order IDs by order date, overall and per customer account
+        self._by_date = TimeIndex()
+        self._by_customer_date = {}
+        # Order IDs and company names for search, overall and per customer account
+        self._search = SearchIndex()
+        self._search_by_customer = {}
+        # Orders with a generated DO the customer has not been notified about
+        self._pending_do = {}
+        # Orders changed since the last snapshot, and the log position it covers
+        self._dirty = set()
+        self._snapshot_seq = 0
+        self._last_seq = 0
+
+        with self._write_lock, self._pool.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS order_events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    label TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    changes TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS order_events_order_id
+                    ON order_events (order_id, seq);
+                CREATE TABLE IF NOT EXISTS order_snapshots (
+                    order_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS snapshot_marker (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    last_seq INTEGER NOT NULL
+                );
+            """)
+            self._migrate_orders_table(conn)
+            self._load(conn)
+
+    def _migrate_orders_table(self, conn):
+        """Convert a database written before the event log into a snapshot."""
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'orders'"
+        ).fetchone():
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        for (data,) in conn.execute("SELECT data FROM orders ORDER BY date, rowid").fetchall():
+            order = loads(data)
+            for update in order.pop('tracking_updates', []):
+                conn.execute(
+                    "INSERT INTO order_events (order_id, event, timestamp, label, message, changes) "
+                    "VALUES (?, 'TrackingUpdated', ?, ?, ?, '{}')",
+                    (order['order_id'], update['timestamp'], update['status'], update['message'])
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO order_snapshots (order_id, data) VALUES (?, ?)",
+                (order['order_id'], dumps(order))
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshot_marker (id, last_seq) "
+            "VALUES (1, (SELECT COALESCE(MAX(seq), 0) FROM order_events))"
+        )
+        conn.execute("DROP TABLE orders")
+        conn.execute("COMMIT")
+
+    def _load(self, conn):
+        """Rebuild the in-memory state from the latest snapshot plus the log tail."""
+        row = conn.execute("SELECT last_seq FROM snapshot_marker WHERE id = 1").fetchone()
+        self._snapshot_seq = self._last_seq = row[0] if row else 0
+
+        snapshot = [loads(data) for (data,) in
+                    conn.execute("SELECT data FROM order_snapshots").fetchall()]
+        snapshot.sort(key=lambda data: to_timestamp(data['date']))
+        for data in snapshot:
+            self._apply(data['order_id'], 'OrderSubmitted', data)
+
+        tail = conn.execute(
+            "SELECT seq, order_id, event, changes FROM order_events WHERE seq > ? ORDER BY seq",
+            (self._snapshot_seq,)
+        ).fetchall()
+        for seq, order_id, event, changes in tail:
+            self._apply(order_id, event, loads(changes))
+            self._dirty.add(order_id)
+            self._last_seq = seq
+
+    def _apply(self, order_id, event, changes):
+        """Fold one event into the in-memory indexes; returns the new order."""
+        current = self._orders.get(order_id)
+        if event == 'OrderSubmitted':
+            order = Order.from_dict(changes)
+            self._by_date.add(order.date, order_id)
+            self._by_customer_date.setdefault(order.customer_email, TimeIndex()).add(order.date, order_id)
+            self._search.add(order_id, order.company_name)
+            self._search_by_customer.setdefault(order.customer_email, SearchIndex()).add(order_id, order.company_name)
+        else:
+            order = replace(current, **Order.normalize(changes), version=current.version + 1)
+            if order.company_name != current.company_name:
+                for index in (self._search, self._search_by_customer[order.customer_email]):
+                    index.rename_company(order_id, current.company_name, order.company_name)
+
+        self._orders[order_id] = order
+        self._index_status(order_id, current and current.status, order.status)
+        if order.status == ORDER_STATUS['DO_GENERATED'] and not order.notification_read:
+            self._pending_do[order_id] = None
+        else:
+            self._pending_do.pop(order_id, None)
+        return order
+
+    def _index_status(self, order_id, old_status, new_status):
+        """Move an order between status buckets; caller holds the write lock."""
+        if old_status == new_status:
+            return
+        if old_status is not None:
+            self._by_status.get(old_status, {}).pop(order_id, None)
+        self._by_status.setdefault(new_status, {})[order_id] = None
+
+    def _append_event(self, order_id, event, changes, message, label=None):
+        """Write one event and fold it into memory; caller holds the write lock."""
+        return self._append_events([(order_id, event, changes, message, label)])[0]
+
+    def _append_events(self, events):
+        """Write (order_id, event, changes, message, label) events in one transaction
+        and fold them into memory; caller holds the write lock."""
+        timestamp = time.time()
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seqs = [
+                    conn.execute(
+                        "INSERT INTO order_events (order_id, event, timestamp, label, message, changes) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (order_id, event, timestamp,
+                         label or EVENTS[event].label, message, dumps(changes))
+                    ).lastrowid
+                    for order_id, event, changes, message, label in events
+                ]
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+            orders = []
+            for (order_id, event, changes, _, _), seq in zip(events, seqs):
+                orders.append(self._apply(order_id, event, changes))
+                self._dirty.add(order_id)
+                self._last_seq = seq
+            if self._last_seq - self._snapshot_seq >= SNAPSHOT_INTERVAL:
+                self._write_snapshot(conn)
+        return orders
+
+    def _write_snapshot(self, conn):
+        """Materialize every order changed since the last snapshot; caller holds the write lock."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO order_snapshots (order_id, data) VALUES (?, ?)",
+                [(order_id, dumps(self._orders[order_id].to_dict())) for order_id in self._dirty]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshot_marker (id, last_seq) VALUES (1, ?)",
+                (self._last_seq,)
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._dirty.clear()
+        self._snapshot_seq = self._last_seq
+
+    def snapshot(self):
+        """Write a snapshot now rather than waiting for SNAPSHOT_INTERVAL events."""
+        with self._write_lock:
+            if self._dirty:
+                with self._pool.connection() as conn:
+                    self._write_snapshot(conn)
+
+    def list_orders(self, status=None, offset=0, limit=None):
+        """Return all orders oldest first, or only those currently in `status`.
+
+        Orders within a status are listed in the order they entered it.
+        `offset` and `limit` select one page of the list.
+        """
+        stop = None if limit is None else offset + limit
+        # Walk the index only up to the page instead of copying every ID; the
+        # lock keeps writers from resizing it mid-walk
+        with self._write_lock:
+            order_ids = self._orders if status is None else self._by_status.get(status, {})
+            return [self._orders[order_id] for order_id in islice(order_ids, offset, stop)]
+
+    def count_orders(self, status=None):
+        """Return the number of orders, or of those currently in `status`."""
+        return len(self._orders if status is None else self._by_status.get(status, ()))
+
+    def count_pending_do(self):
+        """Return the number of generated DOs still waiting for marketing to notify the customer."""
+        return len(self._pending_do)
+
+    def _date_index(self, customer_email):
+        if customer_email is None:
+            return self._by_date
+        return self._by_customer_date.get(customer_email, TimeIndex())
+
+    def list_orders_between(self, start=None, end=None, customer_email=None, offset=0, limit=None):
+        """Return orders dated within [start, end] epoch seconds, oldest first.
+
+        Pass customer_email to search only that account's orders. `offset`
+        and `limit` select one page of the range.
+        """
+        order_ids = self._date_index(customer_email).between(start, end, offset, limit)
+        return [self._orders[order_id] for order_id in order_ids]
+
+    def count_orders_between(self, start=None, end=None, customer_email=None):
+        """Return the number of orders list_orders_between() would return."""
+        return self._date_index(customer_email).count(start, end)
+
+    def search_orders(self, term, customer_email=None):
+        """Return orders whose ID starts with `term` or whose company name
+        matches its words (by word prefix), oldest first.
+
+        Pass customer_email to search only that account's orders.
+        """
+        if customer_email is None:
+            index = self._search
+        else:
+            index = self._search_by_customer.get(customer_email, SearchIndex())
+        orders = [self._orders[order_id] for order_id in index.search(term)]
+        orders.sort(key=lambda order: order.date)
+        return orders
+
+    def get_order(self, order_id):
+        """Return the order with the given ID, or None."""
+        return self._orders.get(order_id)
+
+    def get_tracking_updates(self, order_id):
+        """Return the order's timeline, oldest first, read from the event log."""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT timestamp, label, message FROM order_events WHERE order_id = ? ORDER BY seq",
+                (order_id,)
+            ).fetchall()
+        return [
+            TrackingUpdate(to_timestamp(timestamp), label, message)
+            for timestamp, label, message in rows
+        ]
+
+    def add_order(self, order, message=EVENTS['OrderSubmitted'].message):
+        """Record a new order as an OrderSubmitted event."""
+        data = order.to_dict()
+        data['status'] = get_transition(None, 'OrderSubmitted').target
+        with self._write_lock:
+            if order.order_id in self._orders:
+                raise KeyError(f"Order {order.order_id} already exists")
+            self._append_event(order.order_id, 'OrderSubmitted', data, message)
+
+    def _check_versions(self, expected_versions):
+        """Raise OrderConflictError unless each order is still at the expected version."""
+        for order_id in expected_versions:
+            if order_id not in self._orders:
+                raise KeyError(order_id)
+        conflicts = [
+            order_id for order_id, version in expected_versions.items()
+            if version is not None and self._orders[order_id].version != version
+        ]
+        if conflicts:
+            raise OrderConflictError(conflicts)
+
+    def _resolve_transitions(self, events):
+        """Validate events against the workflow table and add the status and
+        timestamps each one sets; caller holds the write lock.
+
+        An order can appear more than once in a batch, so each event is
+        checked against the order as the earlier events leave it.
+        """
+        resolved = []
+        pending = {}  # order_id -> order after this batch's events so far
+        now = time.time()
+        for order_id, event, changes, message, label in events:
+            current = pending.get(order_id) or self._orders[order_id]
+            transition = get_transition(current.status, event)
+            if 'status' in changes:
+                raise InvalidTransitionError(f"{event} cannot set the status; the workflow table does")
+            changes = dict(changes)
+            if transition.target is not None:
+                changes['status'] = transition.target
+            for field in transition.stamps:
+                changes.setdefault(field, now)
+            pending[order_id] = replace(current, **Order.normalize(dict(changes)))
+            if message is None:
+                message = format_message(transition.message, pending[order_id])
+            resolved.append((order_id, event, changes, message, label))
+        return resolved
+
+    def update_order(self, order_id, event, changes=None, message=None, label=None, expected_version=None):
+        """Record a lifecycle event for an order and return the updated order.
+
+        `changes` are the fields the event sets; the workflow table adds the
+        new status, so `changes` may not include one. The timeline shows
+        `message`, which defaults to the event's message template, and
+        `label`, which defaults to the event's label. Raises
+        InvalidTransitionError if the event is not allowed from the order's
+        status or tries to set it. If expected_version is given, the update is a
+        compare-and-swap that raises OrderConflictError when the order has
+        moved on.
+        """
+        return self.update_orders(
+            [(order_id, event, changes, message, label)],
+            expected_versions={order_id: expected_version}
+        )[0]
+
+    def update_orders(self, updates, expected_versions=None):
+        """Record one lifecycle event on each of several orders in a single write.
+
+        `updates` holds (order_id, event, changes, message) tuples, optionally
+        followed by a label; a None message uses the event's template. Each
+        event is validated as in update_order(). `expected_versions` maps order IDs to the versions
+        the caller read; if any order has moved on, nothing is written and
+        OrderConflictError lists the conflicting orders. Returns the updated
+        orders in the same order.
+        """
+        events = []
+        for update in updates:
+            order_id, event, changes, message, label = (tuple(update) + (None,))[:5]
+            events.append((order_id, event, changes or {}, message, label))
+        if not events:
+            return []
+        versions = dict.fromkeys(order_id for order_id, *_ in events)
+        versions.update(expected_versions or {})
+        with self._write_lock:
+            self._check_versions(versions)
+            return self._append_events(self._resolve_transitions(events))
+
+
+@st.cache_resource
+def get_order_store():
+    """Return the order store shared by all sessions in this server process."""
+    return OrderStore()
@@ -0,0 +1,257 @@
+# order_workflow.py
+from dataclasses import dataclass
+
+# Order statuses, as stored on orders
+ORDER_STATUS = {
+    'PENDING_PRODUCTION': 'pending_production',
+    'REJECTED': 'rejected',
+    'PENDING_PAYMENT_TERM': 'pending_payment_term',
+    'PENDING_PAYMENT_APPROVAL': 'pending_payment_approval',
+    'PAYMENT_TERMS_APPROVED': 'payment_terms_approved',
+    'PAYMENT_TERMS_REJECTED': 'payment_terms_rejected',
+    'PAYMENT_SUBMITTED': 'payment_submitted',
+    'PAYMENT_CLARIFICATION_REQUIRED': 'payment_clarification_required',
+    'PAYMENT_VERIFIED': 'payment_verified',
+    'DO_GENERATED': 'do_generated',
+    'READY_FOR_PICKUP': 'ready_for_pickup',
+    'COMPLETED': 'completed'
+}
+
+# Display label for each status
+STATUS_LABELS = {
+    'pending_production': 'Pending Production',
+    'rejected': 'Rejected by Production',
+    'pending_payment_term': 'Awaiting Payment Term Selection',
+    'pending_payment_approval': 'Pending Payment Term Approval',
+    'payment_terms_approved': 'Payment Terms Approved',
+    'payment_terms_rejected': 'Payment Terms Rejected',
+    'payment_submitted': 'Payment Submitted',
+    'payment_clarification_required': 'Payment Clarification Required',
+    'payment_verified': 'Payment Verified',
+    'do_generated': 'DO Generated',
+    'ready_for_pickup': 'Ready for Pickup',
+    'completed': 'Order Completed'
+}
+
+
+class InvalidTransitionError(ValueError):
+    """Raised when an event is not allowed from an order's current status."""
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationTemplate:
+    recipient: str
+    type: str
+    title: str
+    message: str
+    priority: str = 'high'
+
+
+@dataclass(frozen=True, slots=True)
+class Transition:
+    event: str
+    label: str  # Shown on the tracking timeline
+    sources: tuple = ()  # Statuses the event may fire from; empty allows any
+    target: str = None  # Status after the event; None keeps the current status
+    message: str = ''  # Default timeline message
+    stamps: tuple = ()  # Fields set to the event time
+    notifications: tuple = ()
+
+
+# Message templates are formatted with the order after the event as `order`
+# and its display ID as `short_id`.
+EVENTS = {transition.event: transition for transition in (
+    Transition(
+        'OrderSubmitted', 'Order Submitted',
+        sources=(None,), target='pending_production',
+        message='Order submitted for production approval',
+        notifications=(
+            NotificationTemplate(
+                'customer', 'order_status', 'Order Submitted Successfully',
+                'Your order #{short_id} has been submitted and is pending approval.'
+            ),
+            NotificationTemplate(
+                'production', 'order_status', 'New Order Submitted',
+                'Order #{short_id} has been submitted and is awaiting production approval.'
+            ),
+        )
+    ),
+    Transition(
+        'ProductionApproved', 'Production Approved',
+        sources=('pending_production',), target='pending_payment_term',
+        message='Order approved by production team',
+        notifications=(NotificationTemplate(
+            'customer', 'approval', 'Order Approved by Production',
+            'Your order #{short_id} has been approved. Please select payment terms.'
+        ),)
+    ),
+    Transition(
+        'ProductionRejected', 'Production Rejected',
+        sources=('pending_production',), target='rejected',
+        message='Order rejected by production team',
+        notifications=(NotificationTemplate(
+            'customer', 'rejection', 'Order Rejected by Production',
+            'Your order #{short_id} has been rejected.'
+        ),)
+    ),
+    Transition(
+        'PaymentTermSelected', 'Payment Term Selected',
+        sources=('pending_payment_term',), target='pending_payment_approval',
+        message='Payment term "{order.payment_term}" has been submitted for review.',
+        notifications=(NotificationTemplate(
+            'marketing', 'payment_term', 'Payment Term Submitted',
+            'Payment term "{order.payment_term}" submitted for review.'
+        ),)
+    ),
+    Transition(
+        'PaymentTermsApproved', 'Payment Terms Approved',
+        sources=('pending_payment_approval',), target='payment_terms_approved',
+        message='Your payment terms have been approved. Please proceed with payment.',
+        stamps=('payment_approval_date',),
+        notifications=(NotificationTemplate(
+            'customer', 'payment_terms', 'Payment Terms Approved',
+            'Payment terms for order #{order.order_id} have been approved. Please proceed with payment.'
+        ),)
+    ),
+    Transition(
+        'PaymentTermsRejected', 'Payment Terms Rejected',
+        sources=('pending_payment_approval',), target='payment_terms_rejected',
+        message='Payment terms rejected: {order.rejection_reason}',
+        stamps=('rejection_date',),
+        notifications=(NotificationTemplate(
+            'customer', 'payment_terms', 'Payment Terms Review - Action Required',
+            'Payment terms for order #{order.order_id} require revision. Reason: {order.rejection_reason}. '
+            'Please contact customer support for assistance.'
+        ),)
+    ),
+    Transition(
+        'PaymentTermsResubmitted', 'Payment Terms Resubmitted',
+        sources=('payment_terms_rejected',), target='pending_payment_approval',
+        message='Payment terms have been resubmitted for review.',
+        notifications=(NotificationTemplate(
+            'marketing', 'payment_terms', 'Payment Terms Resubmission',
+            'Order #{order.order_id} has been resubmitted for payment terms review after customer support intervention.'
+        ),)
+    ),
+    Transition(
+        'PaymentSubmitted', 'Payment Submitted',
+        sources=('payment_terms_approved', 'payment_clarification_required'), target='payment_submitted',
+        message='Payment of ${order.payment_amount:.2f} submitted',
+        stamps=('payment_timestamp',),
+        notifications=(
+            NotificationTemplate(
+                'customer', 'payment', 'Payment Submitted',
+                'Payment of ${order.payment_amount:.2f} for order #{short_id} has been submitted and is being processed.'
+            ),
+            NotificationTemplate(
+                'marketing', 'payment_verification', 'Payment Verification Required',
+                'Payment of ${order.payment_amount:.2f} for order #{short_id} requires verification.'
+            ),
+        )
+    ),
+    Transition(
+        'PaymentVerified', 'Payment Verified',
+        sources=('payment_submitted',), target='payment_verified',
+        message='Payment has been verified. Order is being processed.',
+        stamps=('payment_verification_date',),
+        notifications=(
+            NotificationTemplate(
+                'customer', 'payment_status', 'Payment Verified',
+                'Payment for order #{order.order_id} has been verified. Your order is being processed.'
+            ),
+            NotificationTemplate(
+                'production', 'do_request', 'Generate Delivery Order',
+                'Payment verified for order #{order.order_id}. Please generate delivery order.'
+            ),
+        )
+    ),
+    Transition(
+        'PaymentClarificationRequested', 'Payment Clarification Required',
+        sources=('payment_submitted',), target='payment_clarification_required',
+        message='Additional payment information required: {order.clarification_reason}',
+        stamps=('clarification_request_date',),
+        notifications=(NotificationTemplate(
+            'customer', 'payment_clarification', 'Payment Clarification Required',
+            'We need additional information about your payment for order #{order.order_id}: {order.clarification_reason}'
+        ),)
+    ),
+    Transition(
+        'SupportNotesUpdated', 'Support Notes Updated',
+        message='Customer support notes have been updated.'
+    ),
+    Transition(
+        'DOGenerated', 'DO Generated',
+        sources=('payment_verified',), target='do_generated',
+        message='Delivery Order generated. DO Number: {order.do_number}',
+        stamps=('do_date',),
+        notifications=(NotificationTemplate(
+            'marketing', 'do_generated', 'DO Generated - Ready for Customer Notification',
+            'DO has been generated for order #{short_id}. DO Number: {order.do_number}'
+        ),)
+    ),
+    Transition(
+        'ReadyForPickup', 'Ready for Pickup',
+        sources=('do_generated',), target='ready_for_pickup',
+        message='Order is ready for pickup. DO Number: {order.do_number}',
+        notifications=(NotificationTemplate(
+            'customer', 'pickup', 'Order Ready for Pickup',
+            'Your order #{order.order_id} is ready for pickup. DO Number: {order.do_number}. '
+            'Please schedule your pickup time.'
+        ),)
+    ),
+    Transition(
+        'PickupScheduled', 'Pickup Scheduled',
+        sources=('ready_for_pickup',),
+        message='Pickup scheduled for {order.pickup_date} at {order.pickup_time}'
+    ),
+    Transition(
+        'Completed', 'Completed',
+        sources=('ready_for_pickup',), target='completed',
+        message='Order has been received by the customer.'
+    ),
+    # Timeline entries carried over from databases written before the event log
+    Transition('TrackingUpdated', 'Tracking Updated'),
+)}
+
+# (status, event) -> transition for every legal move
+TRANSITIONS = {
+    (source, transition.event): transition
+    for transition in EVENTS.values()
+    for source in transition.sources
+}
+
+
+def get_transition(status, event):
+    """Return the transition for `event` from `status`, or raise InvalidTransitionError."""
+    transition = TRANSITIONS.get((status, event))
+    if transition is None:
+        transition = EVENTS.get(event)
+        if transition is None or transition.sources:
+            raise InvalidTransitionError(f"{event} is not allowed from status {status!r}")
+    return transition
+
+
+def can_transition(status, event):
+    """Return whether `event` may fire from `status`."""
+    return (status, event) in TRANSITIONS or not EVENTS[event].sources
+
+
+def format_message(template, order, **context):
+    """Fill a message template for an order."""
+    return template.format(order=order, short_id=order.order_id[:8], **context)
+
+
+def notifications_for(event, order, **context):
+    """Return create_notifications() arguments for the notifications an event sends."""
+    return [
+        {
+            'order_id': order.order_id,
+            'notification_type': template.type,
+            'title': template.title,
+            'message': format_message(template.message, order, **context),
+            'priority': template.priority,
+            'recipient': template.recipient,
+            'user': order.customer_email if template.recipient == 'customer' else None
+        }
+        for template in EVENTS[event].notifications
+    ]
@@ -0,0 +1,36 @@
+# pagination.py
+import math
+
+import streamlit as st
+
+# Items per page for each paginated list
+PAGE_SIZES = {
+    'customer_catalog': 10,
+    'public_catalog': 10,
+    'customer_tracking': 10,
+    'order_management': 20,
+    'order_history': 25,
+}
+
+
+def page_window(view, total, page_size=None):
+    """Show page controls for a list of `total` items and return the (offset, limit) to render.
+
+    Only the returned window should be fetched and turned into widgets.
+    """
+    page_size = page_size or PAGE_SIZES[view]
+    pages = max(1, math.ceil(total / page_size))
+    key = f"{view}_page"
+
+    # Filters may have shrunk the list since the page was chosen
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages
+
+    page = 1
+    if pages > 1:
+        # No max_value, so the widget keeps its page as the total changes
+        page = min(st.number_input("Page", min_value=1, step=1, key=key), pages)
+
+    offset = (page - 1) * page_size
+    st.caption(f"Showing {offset + 1}-{min(offset + page_size, total)} of {total} (page {page} of {pages})")
+    return offset, page_size
@@ -1,20 +1,26 @@
 # production_module.py
 import streamlit as st
-from datetime import datetime
+from datetime import datetime, time as day_time
+import time
 import pandas as pd
 import uuid
-from notification import create_notification
+from notification import mark_seen, transition_orders
+from order_store import OrderConflictError, get_order_store
+from order_workflow import EVENTS, ORDER_STATUS
+from models import format_timestamp
+from indexes import TimeIndex
+from inbox import Inbox
+from pagination import page_window
+from bulk_actions import select_orders
 
 def initialize_production_state():
     """Initialize all production-related session state variables."""
-    if 'orders' not in st.session_state:
-        st.session_state.orders = []
     if 'production_notifications' not in st.session_state:
-        st.session_state.production_notifications = []
+        st.session_state.production_notifications = Inbox()
     if 'notification_customer' not in st.session_state:
-        st.session_state.notification_customer = []
+        st.session_state.notification_customer = Inbox()
     if 'order_history' not in st.session_state:
-        st.session_state.order_history = []
+        st.session_state.order_history = TimeIndex()
 
 def format_order_id(order_id):
     """Format the order ID to display only the first 8 characters."""
@@ -45,112 +51,150 @@ def show_pending_orders():
     st.subheader("📦 Pending Orders")
     
     # Filter orders that need production approval
-    pending_orders = [order for order in st.session_state.orders if order['status'] == 'pending_production']
+    pending_orders = get_order_store().list_orders(status=ORDER_STATUS['PENDING_PRODUCTION'])
     
     if not pending_orders:
         st.info("No pending orders to review")
         return
     
+    # Apply one decision to many orders in a single write and a single rerun
+    with st.expander("Bulk actions"):
+        selected_orders = select_orders(pending_orders, key="bulk_pending_orders")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Approve selected", key="bulk_approve", disabled=not selected_orders):
+                try:
+                    approve_orders(selected_orders)
+                except OrderConflictError as e:
+                    st.warning(str(e))
+                else:
+                    st.success(f"{len(selected_orders)} orders approved!")
+                    st.rerun()
+        with col2:
+            if st.button("❌ Reject selected", key="bulk_reject", disabled=not selected_orders):
+                try:
+                    reject_orders(selected_orders)
+                except OrderConflictError as e:
+                    st.warning(str(e))
+                else:
+                    st.error(f"{len(selected_orders)} orders rejected!")
+                    st.rerun()
+    
     for order in pending_orders:
         with st.container():
             col1, col2 = st.columns([3, 1])
             
             with col1:
-                st.markdown(f"### Order #{format_order_id(order['order_id'])}")
-                st.write(f"**Company:** {order['company_name']}")
-                st.write(f"**Contact name:** {order['contact_name']}")
-                st.write(f"**Total Amount:** ${order['total']:.2f}")
+                st.markdown(f"### Order #{format_order_id(order.order_id)}")
+                st.write(f"**Company:** {order.company_name}")
+                st.write(f"**Contact name:** {order.contact_name}")
+                st.write(f"**Total Amount:** ${order.total:.2f}")
                 
                 # Show order items
                 with st.expander("View Order Items"):
-                    for item in order['items']:
-                        st.write(f"- {item['seed']}: {item['quantity']}kg at ${item['price_per_kg']}/kg")
-                    if order['special_instructions']:
+                    for item in order.items:
+                        st.write(f"- {item.seed}: {item.quantity}kg at ${item.price_per_kg}/kg")
+                    if order.special_instructions:
                         st.write("**Special Instructions:**")
-                        st.write(order['special_instructions'])
+                        st.write(order.special_instructions)
             
             with col2:
-                if st.button("✅ Approve", key=f"approve_{order['order_id']}"):
-                    update_order_status(order, 'pending_payment_term', True, False)
-                    create_notification(
-                        title='Order Approved by Production',
-                        notification_type='approval',
-                        message=f'Your order #{format_order_id(order["order_id"])} has been approved. Please select payment terms.',
-                        order_id=order['order_id'],
-                        priority='high',
-                        recipient='customer'
-                    )
-                    st.success("Order approved!")
-                    st.rerun()
+                if st.button("✅ Approve", key=f"approve_{order.order_id}"):
+                    try:
+                        approve_orders([order])
+                    except OrderConflictError as e:
+                        st.warning(str(e))
+                    else:
+                        st.success("Order approved!")
+                        st.rerun()
                 
-                if st.button("❌ Reject", key=f"reject_{order['order_id']}"):
-                    update_order_status(order, 'rejected', False, False)
-                    create_notification(
-                        title='Order Rejected by Production',
-                        notification_type='rejection',
-                        message=f'Your order #{format_order_id(order["order_id"])} has been rejected.',
-                        order_id=order['order_id'],
-                        priority='high',
-                        recipient='customer'
-                    )
-                    st.error("Order rejected!")
-                    st.rerun()
+                if st.button("❌ Reject", key=f"reject_{order.order_id}"):
+                    try:
+                        reject_orders([order])
+                    except OrderConflictError as e:
+                        st.warning(str(e))
+                    else:
+                        st.error("Order rejected!")
+                        st.rerun()
+    mark_seen(pending_orders)
+
+def approve_orders(orders):
+    """Approve orders for production and ask the customers to select payment terms."""
+    record_production_decision(orders, True)
 
-def update_order_status(order, status, production_approved, marketing_approved):
-    """Update order status and maintain history."""
+def reject_orders(orders):
+    """Reject orders in production and notify the customers."""
+    record_production_decision(orders, False)
+
+def record_production_decision(orders, approved):
+    """Record the same production decision on several orders in one write and maintain history."""
     # Ensure order_history exists
     if 'order_history' not in st.session_state:
-        st.session_state.order_history = []
-    
-    order['status'] = status
-    order['production_approved'] = production_approved
-    order['marketing_approved'] = marketing_approved
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    message = 'Order approved by production team' if production_approved else 'Order rejected by production team'
-    
-    # Add the status update to order's tracking updates
-    if 'tracking_updates' not in order:
-        order['tracking_updates'] = []
-        
-    order['tracking_updates'].append({
-        'timestamp': timestamp,
-        'status': 'Production Approved' if production_approved else 'Production Rejected',
-        'message': message
-    })
+        st.session_state.order_history = TimeIndex()
+    
+    # Record the production decision on the orders, unless another user decided first
+    event = 'ProductionApproved' if approved else 'ProductionRejected'
+    updated_orders = transition_orders(
+        orders,
+        event,
+        changes={'production_approved': approved, 'marketing_approved': False}
+    )
     
     # Save to order history using formatted order ID
-    history_entry = {
-        'order_id': format_order_id(order['order_id']),
-        'timestamp': timestamp,
-        'status': status,
-        'message': message
-    }
-    
-    st.session_state.order_history.append(history_entry)
+    timestamp = time.time()
+    for order in updated_orders:
+        history_entry = {
+            'order_id': format_order_id(order.order_id),
+            'timestamp': timestamp,
+            'status': order.status,
+            'message': EVENTS[event].message
+        }
+        st.session_state.order_history.add(timestamp, history_entry)
 
 def show_order_history():
+    initialize_production_state()
+    
     st.title("📜 Order History")
     
     # Order history filtering options
     order_id_filter = st.text_input("Filter by Order ID", "")
     date_filter = st.date_input("Filter by Date", None)
     
-    # Filter order history based on the inputs, using formatted order IDs for comparison
-    filtered_history = [
-        history for history in st.session_state.order_history
-        if (order_id_filter in format_order_id(history['order_id'])) and
-           (not date_filter or history['timestamp'].startswith(date_filter.strftime("%Y-%m-%d")))
-    ]
-    
-    if not filtered_history:
+    # Narrow to the selected day with a range query on the time-sorted history
+    history = st.session_state.order_history
+    if date_filter:
+        start = datetime.combine(date_filter, day_time.min).timestamp()
+        end = datetime.combine(date_filter, day_time.max).timestamp()
+    else:
+        start = end = None
+    
+    if order_id_filter:
+        # Filter order history based on the inputs, using formatted order IDs for comparison
+        filtered_history = [
+            entry for entry in history.between(start, end)
+            if order_id_filter in format_order_id(entry['order_id'])
+        ]
+        total = len(filtered_history)
+    else:
+        filtered_history = None
+        total = history.count(start, end)
+    
+    if not total:
         st.info("No order history to display.")
         return
     
+    # Fetch only the visible page of the history
+    offset, limit = page_window('order_history', total)
+    if filtered_history is None:
+        page_entries = history.between(start, end, offset, limit)
+    else:
+        page_entries = filtered_history[offset:offset + limit]
+    
     # Display order history entries with formatted order IDs
-    for entry in filtered_history:
+    for entry in page_entries:
         with st.container():
             st.write(f"**Order ID:** #{format_order_id(entry['order_id'])}")  # Added # for better readability
-            st.write(f"**Timestamp:** {entry['timestamp']}")
+            st.write(f"**Timestamp:** {format_timestamp(entry['timestamp'])}")
             st.write(f"**Status:** {entry['status']}")
             st.write(f"**Message:** {entry['message']}")
             st.divider()
@@ -170,8 +214,8 @@ def show_do_management():
     
     # Filter orders that are payment verified and need DO
     verified_orders = [
-        order for order in st.session_state.orders 
-        if order.get('status') == 'payment_verified' and not order.get('do_number')
+        order for order in get_order_store().list_orders(status=ORDER_STATUS['PAYMENT_VERIFIED'])
+        if not order.do_number
     ]
     
     if not verified_orders:
@@ -179,48 +223,33 @@ def show_do_management():
         return
     
     for order in verified_orders:
-        with st.expander(f"Order #{format_order_id(order['order_id'])} - Generate DO"):
+        with st.expander(f"Order #{format_order_id(order.order_id)} - Generate DO"):
             col1, col2 = st.columns([3, 1])
             
             with col1:
-                st.write(f"**Customer:** {order['contact_name']}")
-                st.write(f"**Company:** {order['company_name']}")
-                st.write(f"**Total Amount:** ${order.get('total', 0):,.2f}")
+                st.write(f"**Customer:** {order.contact_name}")
+                st.write(f"**Company:** {order.company_name}")
+                st.write(f"**Total Amount:** ${order.total:,.2f}")
                 
                 # Show order items
                 st.write("**Order Items:**")
-                for item in order['items']:
-                    st.write(f"- {item['seed']}: {item['quantity']}kg")
+                for item in order.items:
+                    st.write(f"- {item.seed}: {item.quantity}kg")
             
             with col2:
-                if st.button("Generate DO", key=f"do_{order['order_id']}"):
-                    generate_delivery_order(order)
-                    st.success("DO generated successfully!")
-                    st.rerun()
+                if st.button("Generate DO", key=f"do_{order.order_id}"):
+                    try:
+                        generate_delivery_order(order)
+                    except OrderConflictError as e:
+                        st.warning(str(e))
+                    else:
+                        st.success("DO generated successfully!")
+                        st.rerun()
+    mark_seen(verified_orders)
 
 def generate_delivery_order(order):
     # Create DO number
-    do_number = f"DO{datetime.now().strftime('%Y%m%d')}-{format_order_id(order['order_id'])}"
-    
-    # Update order status
-    for idx, o in enumerate(st.session_state.orders):
-        if o['order_id'] == order['order_id']:
-            st.session_state.orders[idx]['status'] = 'do_generated'
-            st.session_state.orders[idx]['do_number'] = do_number
-            st.session_state.orders[idx]['do_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Add tracking update
-            st.session_state.orders[idx]['tracking_updates'].append({
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'DO Generated',
-                'message': f'Delivery Order generated. DO Number: {do_number}'
-            })
-    
-    # Notify marketing team about DO generation
-    create_notification(
-        order_id=format_order_id(order['order_id']),
-        notification_type='do_generated',
-        title='DO Generated - Ready for Customer Notification',
-        message=f"DO has been generated for order #{format_order_id(order['order_id'])}. DO Number: {do_number}",
-        priority='high',
-        recipient='marketing'
-    )
\ No newline at end of file
+    do_number = f"DO{datetime.now().strftime('%Y%m%d')}-{format_order_id(order.order_id)}"
+    
+    # Update order status, add tracking update and notify marketing team
+    transition_orders([order], 'DOGenerated', changes={'do_number': do_number})
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# Keep the app's shared stores away from real data: the order database and
+# image cache go to a temporary directory, and images are never fetched
+_data_dir = tempfile.mkdtemp(prefix='seed-sales-tests-')
+os.environ.setdefault('SEED_SALES_DB', os.path.join(_data_dir, 'orders.db'))
+os.environ.setdefault('SEED_SALES_IMAGES', os.path.join(_data_dir, 'images'))
+os.environ.setdefault('SEED_SALES_OFFLINE', '1')
+
+# The app is a set of top-level modules; make them importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,100 @@
+import os
+
+from catalog_store import CatalogStore
+
+HEADER = 'SeedId,Seed,Description,Price,Min_Order,Germination_Rate,Maturity_Period,Image\n'
+ROWS = [
+    'SEED001,Dura Palm,"Thick shell, high yield",15.00,5,85,24-28 months,\n',
+    'SEED002,Pisifera Palm,"Shell-less, used for breeding tenera",18.00,5,82,26-30 months,\n',
+    'SEED003,Tenera Palm,"Hybrid of dura and pisifera, high yield",20.00,10,90,22-26 months,\n',
+]
+
+
+def write_catalog(path, text):
+    # Move the modification time on, as an edit a moment later would
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_text(text)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def make_store(tmp_path):
+    path = tmp_path / 'catalog.csv'
+    write_catalog(path, HEADER + ''.join(ROWS))
+    loaded = []
+    return path, loaded, CatalogStore(str(path), on_load=loaded.append)
+
+
+def test_catalog_is_parsed_once_until_the_file_changes(tmp_path):
+    path, loaded, store = make_store(tmp_path)
+    catalog = store.catalog()
+    assert len(catalog) == 3 and catalog.max_price == 20.0
+    assert store.catalog() is catalog
+    # Touching the file without changing its contents keeps the parsed catalog
+    write_catalog(path, HEADER + ''.join(ROWS))
+    assert store.catalog() is catalog
+    assert loaded == [catalog]
+
+
+def test_edited_file_is_reloaded(tmp_path):
+    path, loaded, store = make_store(tmp_path)
+    store.catalog()
+    write_catalog(path, HEADER + ''.join(ROWS).replace('15.00', '16.50'))
+    catalog = store.catalog()
+    assert catalog.get('SEED001')['Price'] == 16.5
+    assert len(loaded) == 2
+
+
+def test_bad_or_missing_file_keeps_the_last_good_catalog(tmp_path):
+    path, loaded, store = make_store(tmp_path)
+    good = store.catalog()
+    write_catalog(path, 'SeedId,Seed\nSEED001,Dura Palm\n')
+    assert store.catalog() is good
+    write_catalog(path, HEADER + ROWS[0].replace('15.00', 'fifteen'))
+    assert store.catalog() is good
+    os.remove(path)
+    assert store.catalog() is good
+    # A good file loads again once it is back
+    write_catalog(path, HEADER + ROWS[0])
+    assert len(store.catalog()) == 1
+    assert len(loaded) == 2
+
+
+def test_missing_file_gives_an_empty_catalog(tmp_path):
+    store = CatalogStore(str(tmp_path / 'missing.csv'))
+    catalog = store.catalog()
+    assert len(catalog) == 0 and catalog.max_price == 0.0
+    assert catalog.select((0, 100), 'Price: Low to High') == []
+    assert catalog.get('SEED001') is None
+
+
+def seed_ids(products):
+    return [product['SeedId'] for product in products]
+
+
+def test_select_sorts_and_filters_by_price(tmp_path):
+    _, _, store = make_store(tmp_path)
+    catalog = store.catalog()
+    assert seed_ids(catalog.select((0, 100), 'Price: Low to High')) == ['SEED001', 'SEED002', 'SEED003']
+    assert seed_ids(catalog.select((0, 100), 'Price: High to Low')) == ['SEED003', 'SEED002', 'SEED001']
+    assert seed_ids(catalog.select((0, 100), 'Germination Rate')) == ['SEED003', 'SEED001', 'SEED002']
+    assert seed_ids(catalog.select((15, 18), 'Price: High to Low')) == ['SEED002', 'SEED001']
+    assert catalog.select((21, 100), 'Price: Low to High') == []
+
+
+def test_selections_are_memoized_per_catalog_version(tmp_path):
+    path, _, store = make_store(tmp_path)
+    catalog = store.catalog()
+    selection = catalog.select((0, 100), 'Price: Low to High')
+    assert catalog.select([0, 100], 'Price: Low to High') is selection
+    write_catalog(path, HEADER + ''.join(ROWS).replace('15.00', '25.00'))
+    assert seed_ids(store.catalog().select((0, 100), 'Price: Low to High')) == ['SEED002', 'SEED003', 'SEED001']
+
+
+def test_search_ranks_matches_and_respects_the_price_range(tmp_path):
+    _, _, store = make_store(tmp_path)
+    catalog = store.catalog()
+    assert catalog.search('tenera') == ['SEED003', 'SEED002']
+    assert seed_ids(catalog.select((0, 100), 'Price: Low to High', 'High Yield ')) == ['SEED001', 'SEED003']
+    assert seed_ids(catalog.select((16, 100), 'Price: Low to High', 'high yield')) == ['SEED003']
+    assert catalog.select((0, 100), 'Price: Low to High', 'coconut') == []
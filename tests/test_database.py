@@ -0,0 +1,43 @@
+import threading
+
+from database import ConnectionPool
+
+
+def test_connections_are_reused_across_threads(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), size=1)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+    borrowed = []
+
+    def borrow():
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO items VALUES ('seed')")
+            borrowed.append(conn)
+
+    thread = threading.Thread(target=borrow)
+    thread.start()
+    thread.join()
+    with pool.connection() as conn:
+        assert conn is borrowed[0]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("SELECT name FROM items").fetchall() == [('seed',)]
+
+
+def test_open_transactions_are_rolled_back_on_return(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT INTO items VALUES ('seed')")
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+def test_only_size_idle_connections_are_kept(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'), size=1)
+    with pool.connection() as first, pool.connection() as second:
+        assert first is not second
+    with pool.connection() as conn:
+        assert conn is first or conn is second
+    assert len(pool._idle) == 1
@@ -0,0 +1,68 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from image_store import ImageStore
+
+
+def write_image(path, color, size=(300, 200)):
+    # Move the modification time on, as a replacement a moment later would
+    stat = os.stat(path) if os.path.exists(path) else None
+    Image.new('RGB', size, color).save(path, format='PNG')
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return str(path)
+
+
+def open_png(data):
+    image = Image.open(io.BytesIO(data))
+    assert image.format == 'PNG'
+    return image
+
+
+def test_local_image_gets_a_fixed_size_thumbnail(tmp_path):
+    store = ImageStore(str(tmp_path / 'cache'), offline=True)
+    source = write_image(tmp_path / 'dura.png', 'red')
+    image = open_png(store.thumbnail(source, 'Dura Palm'))
+    assert image.size == (150, 150)
+    # Padded, not stretched: the centre keeps the image's colour
+    assert image.convert('RGB').getpixel((75, 75)) == (255, 0, 0)
+
+
+def test_replaced_local_image_is_picked_up(tmp_path):
+    store = ImageStore(str(tmp_path / 'cache'), offline=True)
+    source = write_image(tmp_path / 'dura.png', 'red')
+    first = store.thumbnail(source, 'Dura Palm')
+    write_image(tmp_path / 'dura.png', 'blue')
+    second = store.thumbnail(source, 'Dura Palm')
+    assert second != first
+    assert open_png(second).convert('RGB').getpixel((75, 75)) == (0, 0, 255)
+
+
+def test_restart_serves_stored_thumbnails_without_reading_the_source(tmp_path, monkeypatch):
+    source = write_image(tmp_path / 'dura.png', 'red')
+    thumbnail = ImageStore(str(tmp_path / 'cache'), offline=True).thumbnail(source, 'Dura Palm')
+
+    restarted = ImageStore(str(tmp_path / 'cache'), offline=True)
+    monkeypatch.setattr(restarted, '_read_source', lambda source: pytest.fail(f"{source} was read again"))
+    assert restarted.thumbnail(source, 'Dura Palm') == thumbnail
+
+
+def test_remote_image_while_offline_gets_a_placeholder(tmp_path):
+    store = ImageStore(str(tmp_path / 'cache'), offline=True)
+    data = store.thumbnail('https://example.com/dura.png', 'Dura Palm')
+    assert data == store.placeholder('Dura Palm')
+    assert open_png(data).size == (150, 150)
+    assert store.import_source('https://example.com/dura.png') is None
+    assert not os.path.exists(tmp_path / 'cache' / 'sources.json')
+
+
+def test_missing_or_broken_images_get_a_placeholder(tmp_path):
+    store = ImageStore(str(tmp_path / 'cache'), offline=True)
+    broken = tmp_path / 'broken.png'
+    broken.write_bytes(b'not an image')
+    assert store.thumbnail(str(tmp_path / 'missing.png'), 'Dura Palm') == store.placeholder('Dura Palm')
+    assert store.thumbnail(str(broken), 'Tenera Palm') == store.placeholder('Tenera Palm')
+    assert store.thumbnail('', '') == store.placeholder('')
@@ -0,0 +1,152 @@
+from inbox import DAY, Inbox, RetentionPolicy
+from models import Notification
+
+
+def make_notification(index, timestamp=None, type='order_status', title=None, priority='high', order_id=None):
+    return Notification(
+        id=f'n{index}', type=type, title=title or f'Title {index}', message=f'Message {index}',
+        timestamp=index if timestamp is None else timestamp,
+        order_id=order_id or f'order-{index}', priority=priority
+    )
+
+
+def ids(entries):
+    return [entry.id for entry in entries]
+
+
+def test_duplicates_are_skipped():
+    inbox = Inbox()
+    for index in range(3):
+        assert inbox.add(make_notification(index))
+    assert not inbox.add(make_notification(9, title='Title 1', order_id='order-1'))
+    assert len(inbox) == 3
+    assert ('order-1', 'order_status', 'Title 1') in inbox
+    assert ('order-1', 'order_status', 'Title 2') not in inbox
+    # Same order and title but another type is a different notification
+    assert inbox.add(make_notification(10, type='payment', title='Title 1', order_id='order-1'))
+
+
+def test_unread_count_follows_adds_and_reads():
+    inbox = Inbox()
+    for index in range(3):
+        inbox.add(make_notification(index))
+    assert inbox.unread_count == 3
+    version = inbox.version
+    assert inbox.mark_read(inbox.get('n1'))
+    assert not inbox.mark_read(inbox.get('n1'))
+    assert inbox.unread_count == 2 and inbox.version > version
+    # A duplicate is not counted
+    inbox.add(make_notification(9, title='Title 0', order_id='order-0'))
+    assert inbox.unread_count == 2
+
+
+def test_retention_evicts_old_read_and_overflowing_entries():
+    now = 100 * DAY
+    policy = RetentionPolicy(max_age_days=30, archive_read_after_days=7, max_count=3)
+    inbox = Inbox(digest_window=0)
+    inbox.add(make_notification(0, timestamp=now - 40 * DAY))  # Too old
+    inbox.add(make_notification(1, timestamp=now - 10 * DAY))  # Read and past a week
+    inbox.add(make_notification(2, timestamp=now - 10 * DAY))  # Unread, kept
+    for index in range(3, 6):
+        inbox.add(make_notification(index, timestamp=now - index))
+    inbox.mark_read(inbox.get('n1'))
+
+    expired = inbox.expired(policy, now)
+    assert sorted(ids(expired)) == ['n0', 'n1', 'n2']
+    inbox.remove(expired)
+    assert sorted(ids(inbox)) == ['n3', 'n4', 'n5']
+    assert inbox.unread_count == 3
+    # Evicted keys are free again
+    assert inbox.add(make_notification(0, timestamp=now))
+
+
+def test_burst_of_same_notification_becomes_a_digest():
+    inbox = Inbox(digest_window=60)
+    inbox.add(make_notification(0, timestamp=1000, title='Payment Verified'))
+    inbox.add(make_notification(1, timestamp=1010, title='Other'))
+    inbox.add(make_notification(2, timestamp=1020, title='Payment Verified'))
+    digest = inbox.get('n2')
+    assert digest is inbox.get('n0')
+    assert digest.count == 2 and digest.order_ids == ['order-0', 'order-2']
+    # Joining a digest brings it back to the top with the newest time
+    assert ids(inbox) == ['n0', 'n1']
+    assert digest.timestamp == 1020
+    assert [detail.timestamp for detail in digest.details] == [1000, 1020]
+    assert ids(inbox.filter(read=False)) == ['n0', 'n1']
+
+
+def test_reading_a_digest_closes_it():
+    inbox = Inbox(digest_window=60)
+    inbox.add(make_notification(0, timestamp=1000, title='Payment Verified'))
+    inbox.add(make_notification(1, timestamp=1010, title='Payment Verified'))
+    digest = inbox.get('n0')
+    inbox.mark_read(digest)
+    assert all(detail.read for detail in digest.details)
+    inbox.add(make_notification(2, timestamp=1020, title='Payment Verified'))
+    assert ids(inbox) == ['n2', 'n0']
+
+
+def test_notifications_outside_the_window_stay_separate():
+    inbox = Inbox(digest_window=60)
+    inbox.add(make_notification(0, timestamp=1000, title='Payment Verified'))
+    inbox.add(make_notification(1, timestamp=2000, title='Payment Verified'))
+    assert ids(inbox) == ['n1', 'n0']
+
+
+def test_removing_a_digest_drops_its_members():
+    inbox = Inbox(digest_window=60)
+    inbox.add(make_notification(0, timestamp=1000, title='Payment Verified'))
+    inbox.add(make_notification(1, timestamp=1010, title='Payment Verified'))
+    inbox.remove([inbox.get('n0')])
+    assert len(inbox) == 0 and inbox.unread_count == 0
+    assert inbox.get('n1') is None
+    assert inbox.add(make_notification(1, timestamp=1010, title='Payment Verified'))
+
+
+def test_entries_come_latest_arrival_first():
+    inbox = Inbox(digest_window=0)
+    for index in (1, 0, 2):
+        inbox.add(make_notification(index))
+    assert ids(inbox) == ['n2', 'n0', 'n1']
+    assert ids(inbox.filter(priority='high')) == ['n2', 'n0', 'n1']
+
+
+def test_filters_combine_priority_type_and_read():
+    inbox = Inbox(digest_window=0)
+    inbox.add(make_notification(0, priority='high', type='payment'))
+    inbox.add(make_notification(1, priority='low', type='payment'))
+    inbox.add(make_notification(2, priority='high', type='approval'))
+    inbox.add(make_notification(3, priority='high', type='payment'))
+    inbox.mark_read(inbox.get('n3'))
+    assert ids(inbox.filter(priority='HIGH', notification_type='payment')) == ['n3', 'n0']
+    assert ids(inbox.filter(read=False, notification_type='payment')) == ['n1', 'n0']
+    assert ids(inbox.filter(read=False)) == ['n2', 'n1', 'n0']
+    assert ids(inbox.filter(read=True)) == ['n3']
+
+
+def test_pages_resume_from_a_cursor():
+    inbox = Inbox()
+    for index in range(5):
+        inbox.add(make_notification(index))
+    first, more = inbox.page(limit=2)
+    assert ids(first) == ['n4', 'n3'] and more
+    second, more = inbox.page(limit=2, before=inbox.cursor(first[-1]))
+    assert ids(second) == ['n2', 'n1'] and more
+    last, more = inbox.page(limit=2, before=inbox.cursor(second[-1]))
+    assert ids(last) == ['n0'] and not more
+    window, more = inbox.page(since=inbox.cursor(second[-1]))
+    assert ids(window) == ['n4', 'n3', 'n2', 'n1'] and more
+
+
+def test_mark_all_read_covers_earlier_entries_only():
+    inbox = Inbox()
+    for index in range(3):
+        inbox.add(make_notification(index))
+    version = inbox.version
+    inbox.mark_all_read()
+    assert inbox.unread_count == 0 and inbox.version > version
+    assert ids(inbox.filter(read=False)) == []
+    assert all(entry.read for entry in inbox.filter())
+    inbox.add(make_notification(3))
+    assert ids(inbox.filter(read=False)) == ['n3']
+    assert inbox.unread_count == 1
@@ -0,0 +1,77 @@
+from indexes import RankedIndex, SearchIndex, TimeIndex, tokenize
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize('Green-Valley Estates, Sdn. Bhd.') == ['green', 'valley', 'estates', 'sdn', 'bhd']
+
+
+def test_search_index_matches_id_prefix_and_company_words():
+    index = SearchIndex()
+    index.add('ABC12345-0001', 'Green Valley Estates')
+    index.add('abd99999-0002', 'Valley Green Farms')
+    index.add('xyz00000-0003', 'Blue River')
+    assert index.search('#abc') == {'ABC12345-0001'}
+    assert index.search('ab') == {'ABC12345-0001', 'abd99999-0002'}
+    assert index.search('val gre') == {'ABC12345-0001', 'abd99999-0002'}
+    assert index.search('green farms') == {'abd99999-0002'}
+    assert index.search('  ') == set()
+
+
+def test_search_index_follows_company_renames():
+    index = SearchIndex()
+    index.add('order-1', 'Old Name')
+    index.rename_company('order-1', 'Old Name', 'New Name')
+    assert index.search('old') == set()
+    assert index.search('new') == {'order-1'}
+
+
+def test_time_index_keeps_values_in_time_order():
+    index = TimeIndex()
+    for timestamp, value in ((10, 'a'), (30, 'c'), (20, 'b'), (30, 'd')):
+        index.add(timestamp, value)
+    assert list(index) == ['a', 'b', 'c', 'd']
+    assert len(index) == 4
+
+
+def test_time_index_range_queries_include_both_ends():
+    index = TimeIndex()
+    for timestamp in range(10):
+        index.add(timestamp, timestamp)
+    assert index.between(3, 6) == [3, 4, 5, 6]
+    assert index.count(3, 6) == 4
+    assert index.between(start=8) == [8, 9]
+    assert index.between(end=1) == [0, 1]
+    assert index.between(2, 8, offset=2, limit=3) == [4, 5, 6]
+    assert index.between(2, 8, offset=6, limit=3) == [8]
+    assert index.count(20, 30) == 0
+
+
+def make_ranked_index():
+    index = RankedIndex()
+    index.add('SEED001', [('Dura Palm', 3), ('Thick shell, high yield', 1)])
+    index.add('SEED002', [('Pisifera Palm', 3), ('Shell-less, used for breeding tenera', 1)])
+    index.add('SEED003', [('Tenera Palm', 3), ('Hybrid of dura and pisifera, high yield', 1)])
+    return index
+
+
+def test_ranked_index_requires_every_word():
+    index = make_ranked_index()
+    assert len(index) == 3
+    assert index.search('high yield') == ['SEED001', 'SEED003']
+    assert index.search('palm nothing') == []
+    assert index.search('') == []
+
+
+def test_ranked_index_prefers_heavier_fields_and_whole_words():
+    index = make_ranked_index()
+    # A name match outranks a description match
+    assert index.search('tenera') == ['SEED003', 'SEED002']
+    assert index.search('dura') == ['SEED001', 'SEED003']
+    # Prefixes match; whole words score higher
+    assert index.search('pis') == ['SEED002', 'SEED003']
+
+
+def test_ranked_index_breaks_ties_by_insertion_order_and_limits():
+    index = make_ranked_index()
+    assert index.search('palm') == ['SEED001', 'SEED002', 'SEED003']
+    assert index.search('palm', limit=2) == ['SEED001', 'SEED002']
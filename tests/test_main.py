@@ -0,0 +1,41 @@
+from streamlit.testing.v1 import AppTest
+
+import main
+from catalog_store import CatalogStore
+from test_catalog_store import HEADER
+
+
+def public_catalog():
+    import main
+
+    main.show_public_catalog()
+
+
+def catalog_page(tmp_path, monkeypatch, count):
+    path = tmp_path / 'catalog.csv'
+    path.write_text(HEADER + ''.join(
+        f'SEED{index:03},Palm {index},Variety {index},{index}.00,5,80,24 months,\n'
+        for index in range(1, count + 1)
+    ))
+    store = CatalogStore(str(path))
+    monkeypatch.setattr(main, 'get_catalog', store.catalog)
+    return AppTest.from_function(public_catalog, default_timeout=30).run()
+
+
+def inquiry_keys(at):
+    return [button.key for button in at.button if button.key.startswith('inquiry_')]
+
+
+def test_public_catalog_renders_one_page_of_products(tmp_path, monkeypatch):
+    at = catalog_page(tmp_path, monkeypatch, 25)
+    assert inquiry_keys(at) == [f'inquiry_SEED{index:03}' for index in range(1, 11)]
+    assert at.caption[-1].value == 'Showing 1-10 of 25 (page 1 of 3)'
+
+    at.number_input(key='public_catalog_page').set_value(3).run()
+    assert inquiry_keys(at) == [f'inquiry_SEED{index:03}' for index in range(21, 26)]
+
+
+def test_small_catalog_has_no_page_control(tmp_path, monkeypatch):
+    at = catalog_page(tmp_path, monkeypatch, 5)
+    assert len(inquiry_keys(at)) == 5
+    assert not at.number_input
@@ -0,0 +1,58 @@
+import os
+import uuid
+
+from streamlit.testing.v1 import AppTest
+
+from order_store import get_order_store
+from test_order_store import make_order
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def support_page():
+    at = AppTest.from_file(MAIN, default_timeout=30)
+    at.session_state['authenticated'] = True
+    at.session_state['user_role'] = 'marketing'
+    at.session_state['user_name'] = 'marketing'
+    at.session_state['user_email'] = 'marketing@example.com'
+    at.session_state['current_page'] = 'customer_support'
+    return at.run()
+
+
+def rejected_order():
+    """Add an order waiting in the customer support queue; returns its ID."""
+    store = get_order_store()
+    order_id = str(uuid.uuid4())
+    store.add_order(make_order(order_id))
+    store.update_order(order_id, 'ProductionApproved')
+    store.update_order(order_id, 'PaymentTermSelected', {'payment_term': 'Net 30'})
+    store.update_order(order_id, 'PaymentTermsRejected', {'rejection_reason': 'No credit history'})
+    return order_id
+
+
+def save_notes(at, order_id, notes):
+    at.text_area(key=f"support_notes_{order_id}").input(notes)
+    return at.button(key=f"update_notes_{order_id}").click().run()
+
+
+def test_consecutive_saves_by_one_user_succeed():
+    order_id = rejected_order()
+    at = support_page()
+    for notes in ('First call', 'Second call', 'Third call'):
+        save_notes(at, order_id, notes)
+        assert not at.exception
+        assert not at.warning, notes
+        assert get_order_store().get_order(order_id).support_notes == notes
+
+
+def test_save_over_someone_elses_change_is_rejected_once():
+    order_id = rejected_order()
+    first, second = support_page(), support_page()
+    save_notes(first, order_id, 'From the first reviewer')
+    save_notes(second, order_id, 'From the second reviewer')
+    assert 'changed by someone else' in second.warning[0].value
+    assert get_order_store().get_order(order_id).support_notes == 'From the first reviewer'
+    # The draft survives, and saving it again after the warning goes through
+    assert second.text_area(key=f"support_notes_{order_id}").value == 'From the second reviewer'
+    second.button(key=f"update_notes_{order_id}").click().run()
+    assert get_order_store().get_order(order_id).support_notes == 'From the second reviewer'
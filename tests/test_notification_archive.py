@@ -0,0 +1,33 @@
+from models import Notification
+from notification_archive import NotificationArchive
+
+
+def make_notification(index, title='Order Approved', order_id=None, read=False):
+    return Notification(
+        id=f'n{index}', type='approval', title=title, message=f'Message {index}',
+        timestamp=index, order_id=order_id or f'order-{index}', read=read
+    )
+
+
+def test_archived_notifications_are_searched_per_owner(tmp_path):
+    archive = NotificationArchive(str(tmp_path / 'archive.db'))
+    archive.archive('customer:a@example.com', [make_notification(0), make_notification(1, title='Payment Verified')])
+    archive.archive('customer:b@example.com', [make_notification(2)])
+    assert [n.id for n in archive.search('customer:a@example.com')] == ['n1', 'n0']
+    assert [n.id for n in archive.search('customer:a@example.com', 'payment')] == ['n1']
+    assert [n.id for n in archive.search('customer:a@example.com', '#order-0')] == ['n0']
+    assert archive.count('customer:b@example.com') == 1
+
+
+def test_archiving_again_stores_a_notification_once(tmp_path):
+    archive = NotificationArchive(str(tmp_path / 'archive.db'))
+    archive.archive('marketing', [make_notification(0)])
+    archive.archive('marketing', [make_notification(0, read=True)])
+    assert archive.count('marketing') == 1
+    assert archive.search('marketing')[0].read
+
+
+def test_search_terms_are_matched_literally(tmp_path):
+    archive = NotificationArchive(str(tmp_path / 'archive.db'))
+    archive.archive('marketing', [make_notification(0, title='100% paid'), make_notification(1, title='1000 paid')])
+    assert [n.id for n in archive.search('marketing', '0%')] == ['n0']
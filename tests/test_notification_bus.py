@@ -0,0 +1,99 @@
+import time
+
+from models import Notification
+from notification_bus import NotificationBus, channel_for
+
+
+def make_notification(index, order_id=None):
+    return Notification(
+        id=f'n{index}', type='order_status', title='Order Approved', message='Approved',
+        timestamp=index, order_id=order_id or f'order-{index}'
+    )
+
+
+def ids(notifications):
+    return [notification.id for notification in notifications]
+
+
+def test_customers_get_their_own_channel_and_staff_share_one():
+    assert channel_for('customer', 'a@example.com') != channel_for('customer', 'b@example.com')
+    assert channel_for('production', 'a@example.com') == channel_for('production', 'b@example.com')
+
+
+def test_published_notifications_reach_every_subscriber_once():
+    bus = NotificationBus()
+    channel = channel_for('marketing')
+    bus.subscribe(channel, 'session-a')
+    bus.subscribe(channel, 'session-b')
+    assert bus.publish(channel, make_notification(0))
+    assert ids(bus.drain(channel, 'session-a')) == ['n0']
+    assert bus.drain(channel, 'session-a') == []
+    assert ids(bus.drain(channel, 'session-b')) == ['n0']
+    assert bus.drain(channel_for('production'), 'session-a') is None
+
+
+def test_duplicates_are_not_published():
+    bus = NotificationBus()
+    channel = channel_for('customer', 'a@example.com')
+    bus.subscribe(channel, 'session')
+    assert bus.publish(channel, make_notification(0, order_id='order-1'))
+    assert not bus.publish(channel, make_notification(1, order_id='order-1'))
+    assert ids(bus.drain(channel, 'session')) == ['n0']
+
+
+def test_late_subscribers_get_the_history_replayed():
+    bus = NotificationBus()
+    channel = channel_for('production')
+    bus.publish(channel, make_notification(0))
+    bus.subscribe(channel, 'replayed')
+    bus.subscribe(channel, 'fresh', replay=False)
+    bus.publish(channel, make_notification(1))
+    assert ids(bus.drain(channel, 'replayed')) == ['n0', 'n1']
+    assert ids(bus.drain(channel, 'fresh')) == ['n1']
+
+
+def test_unsubscribed_sessions_stop_receiving():
+    bus = NotificationBus()
+    channel = channel_for('production')
+    bus.subscribe(channel, 'session')
+    bus.unsubscribe(channel, 'session')
+    bus.publish(channel, make_notification(0))
+    assert bus.drain(channel, 'session') is None
+
+
+def test_history_and_mailboxes_are_bounded():
+    bus = NotificationBus(history_size=2, mailbox_size=2)
+    channel = channel_for('production')
+    bus.subscribe(channel, 'session')
+    for index in range(3):
+        bus.publish(channel, make_notification(index))
+    assert ids(bus.drain(channel, 'session')) == ['n1', 'n2']
+    # The evicted notification's key is forgotten with it
+    assert bus.publish(channel, make_notification(3, order_id='order-0'))
+
+
+def test_idle_subscribers_are_dropped_on_publish():
+    bus = NotificationBus(idle_seconds=0.05)
+    channel = channel_for('production')
+    bus.subscribe(channel, 'closed-tab')
+    bus.subscribe(channel, 'open-tab')
+    time.sleep(0.1)
+    assert bus.drain(channel, 'open-tab') == []
+    bus.publish(channel, make_notification(0))
+    assert bus.subscriber_count(channel) == 1
+    assert bus.drain(channel, 'closed-tab') is None
+    assert ids(bus.drain(channel, 'open-tab')) == ['n0']
+
+
+def test_dropped_subscribers_can_catch_up_from_the_history():
+    bus = NotificationBus(idle_seconds=0.05)
+    channel = channel_for('production')
+    bus.publish(channel, make_notification(0))
+    bus.subscribe(channel, 'session')
+    assert ids(bus.drain(channel, 'session')) == ['n0']
+    time.sleep(0.1)
+    bus.publish(channel, make_notification(1))
+    bus.publish(channel, make_notification(2))
+    assert bus.drain(channel, 'session') is None
+    bus.subscribe(channel, 'session', since=1)
+    assert ids(bus.drain(channel, 'session')) == ['n1', 'n2']
@@ -0,0 +1,270 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+import order_store
+from models import CartItem, Order, format_timestamp
+from order_store import OrderConflictError, OrderStore
+from order_workflow import InvalidTransitionError
+
+
+def make_order(order_id, date=None, company_name='Acme Plantations', customer_email='jane@acme.com'):
+    return Order(
+        order_id=order_id, date=time.time() if date is None else date,
+        items=[CartItem('item-1', 'Tenera Palm', 10, 25.0, 250.0)], total=250.0,
+        company_name=company_name, contact_name='Jane', email='jane@acme.com',
+        phone='+6012-3456789', courier_company='FastCo', customer_email=customer_email
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'orders.db')
+
+
+@pytest.fixture
+def store(db_path):
+    return OrderStore(db_path)
+
+
+def test_add_order_starts_pending_production(store):
+    store.add_order(make_order('order-1'))
+    order = store.get_order('order-1')
+    assert order.status == 'pending_production'
+    assert [update.status for update in store.get_tracking_updates('order-1')] == ['Order Submitted']
+
+
+def test_events_are_logged_on_the_timeline(store):
+    store.add_order(make_order('order-1'))
+    store.update_order('order-1', 'ProductionApproved')
+    store.update_order('order-1', 'SupportNotesUpdated', {'support_notes': 'Called back'}, message='Left a voicemail')
+    assert [(u.status, u.message) for u in store.get_tracking_updates('order-1')] == [
+        ('Order Submitted', 'Order submitted for production approval'),
+        ('Production Approved', 'Order approved by production team'),
+        ('Support Notes Updated', 'Left a voicemail'),
+    ]
+    assert store.get_order('order-1').support_notes == 'Called back'
+
+
+def test_restart_loads_snapshot_and_replays_tail(db_path, store, monkeypatch):
+    monkeypatch.setattr(order_store, 'SNAPSHOT_INTERVAL', 3)
+    for index in range(2):
+        store.add_order(make_order(f'order-{index}', date=index))
+    store.update_order('order-0', 'ProductionApproved')  # Third event writes a snapshot
+    store.update_order('order-1', 'SupportNotesUpdated', {'support_notes': 'after snapshot'})
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT last_seq FROM snapshot_marker").fetchone()[0] == 3
+
+    reloaded = OrderStore(db_path)
+    assert [repr(o) for o in reloaded.list_orders()] == [repr(o) for o in store.list_orders()]
+    assert reloaded.get_order('order-1').support_notes == 'after snapshot'
+    assert reloaded.get_order('order-0').status == 'pending_payment_term'
+
+
+def test_explicit_snapshot_covers_the_whole_log(db_path, store):
+    store.add_order(make_order('order-1'))
+    store.update_order('order-1', 'ProductionApproved')
+    store.snapshot()
+    reloaded = OrderStore(db_path)
+    assert reloaded.get_order('order-1') == store.get_order('order-1')
+    assert len(reloaded.get_tracking_updates('order-1')) == 2
+
+
+def test_legacy_orders_table_is_migrated(db_path):
+    legacy = make_order('order-1', date=1700000000).to_dict()
+    legacy['date'] = format_timestamp(legacy['date'])
+    legacy['tracking_updates'] = [
+        {'timestamp': legacy['date'], 'status': 'Order Submitted', 'message': 'Order submitted'},
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE orders (order_id TEXT PRIMARY KEY, date TEXT NOT NULL, data TEXT NOT NULL)")
+        conn.execute("INSERT INTO orders VALUES (?, ?, ?)", ('order-1', legacy['date'], json.dumps(legacy)))
+
+    store = OrderStore(db_path)
+    order = store.get_order('order-1')
+    assert order.date == 1700000000
+    assert order.status == 'pending_production'
+    assert [(u.status, u.message) for u in store.get_tracking_updates('order-1')] == [
+        ('Order Submitted', 'Order submitted')
+    ]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'orders'").fetchone() is None
+    # Reopening the migrated database does not migrate again
+    assert OrderStore(db_path).count_orders() == 1
+
+
+def test_events_bump_the_version(store):
+    store.add_order(make_order('order-1'))
+    assert store.get_order('order-1').version == 0
+    store.update_order('order-1', 'ProductionApproved')
+    assert store.update_order('order-1', 'SupportNotesUpdated', {'support_notes': 'x'}).version == 2
+
+
+def test_stale_expected_version_raises_conflict(store):
+    store.add_order(make_order('order-1'))
+    seen = store.get_order('order-1').version
+    store.update_order('order-1', 'SupportNotesUpdated', {'support_notes': 'first'}, expected_version=seen)
+    with pytest.raises(OrderConflictError) as error:
+        store.update_order('order-1', 'SupportNotesUpdated', {'support_notes': 'second'}, expected_version=seen)
+    assert error.value.order_ids == ['order-1']
+    assert store.get_order('order-1').support_notes == 'first'
+
+
+def test_batch_update_is_all_or_nothing(store):
+    for order_id in ('order-1', 'order-2'):
+        store.add_order(make_order(order_id))
+    store.update_order('order-2', 'SupportNotesUpdated', {'support_notes': 'changed'})
+    with pytest.raises(OrderConflictError) as error:
+        store.update_orders(
+            [('order-1', 'ProductionApproved', None, None), ('order-2', 'ProductionApproved', None, None)],
+            expected_versions={'order-1': 0, 'order-2': 0}
+        )
+    assert error.value.order_ids == ['order-2']
+    assert store.count_orders(status='pending_production') == 2
+    assert len(store.get_tracking_updates('order-1')) == 1
+
+
+def test_versions_survive_a_restart(db_path, store):
+    store.add_order(make_order('order-1'))
+    store.update_order('order-1', 'SupportNotesUpdated', {'support_notes': 'x'})
+    reloaded = OrderStore(db_path)
+    assert reloaded.get_order('order-1').version == 1
+    with pytest.raises(OrderConflictError):
+        reloaded.update_order('order-1', 'ProductionApproved', expected_version=0)
+
+
+def test_events_move_status_and_stamp_fields(store):
+    store.add_order(make_order('order-1'))
+    store.update_order('order-1', 'ProductionApproved')
+    order = store.update_order('order-1', 'PaymentTermSelected', {'payment_term': 'Prepayment'})
+    assert order.status == 'pending_payment_approval'
+    order = store.update_order('order-1', 'PaymentTermsApproved')
+    assert order.payment_approval_date is not None
+    assert store.get_tracking_updates('order-1')[-1].message == (
+        'Your payment terms have been approved. Please proceed with payment.'
+    )
+
+
+def test_event_not_allowed_from_status_is_rejected(store):
+    store.add_order(make_order('order-1'))
+    with pytest.raises(InvalidTransitionError):
+        store.update_order('order-1', 'Completed')
+    assert store.get_order('order-1').version == 0
+
+
+def test_changes_cannot_set_status(store):
+    store.add_order(make_order('order-1'))
+    with pytest.raises(InvalidTransitionError):
+        store.update_order('order-1', 'SupportNotesUpdated', {'status': 'completed'})
+    assert store.get_order('order-1').status == 'pending_production'
+
+
+def test_repeated_order_in_a_batch_is_checked_against_earlier_events(store):
+    store.add_order(make_order('order-1'))
+    store.add_order(make_order('order-2'))
+    with pytest.raises(InvalidTransitionError):
+        store.update_orders([
+            ('order-2', 'ProductionApproved', None, None),
+            ('order-1', 'ProductionApproved', None, None),
+            ('order-1', 'ProductionApproved', None, None),
+        ])
+    assert store.count_orders(status='pending_production') == 2
+    assert len(store.get_tracking_updates('order-1')) == 1
+
+
+def test_batch_can_move_an_order_through_several_events(store):
+    store.add_order(make_order('order-1'))
+    orders = store.update_orders([
+        ('order-1', 'ProductionApproved', None, None),
+        ('order-1', 'PaymentTermSelected', {'payment_term': 'Prepayment'}, None),
+    ])
+    assert [order.status for order in orders] == ['pending_payment_term', 'pending_payment_approval']
+    assert store.get_tracking_updates('order-1')[-1].message == (
+        'Payment term "Prepayment" has been submitted for review.'
+    )
+
+
+def test_search_by_id_prefix_and_company_words(store):
+    store.add_order(make_order('abc12345-1', company_name='Green Valley Estates'))
+    store.add_order(make_order('def67890-2', company_name='Blue River Farms'))
+    assert [o.order_id for o in store.search_orders('#abc1')] == ['abc12345-1']
+    assert [o.order_id for o in store.search_orders('riv far')] == ['def67890-2']
+
+
+def test_customer_search_only_sees_that_customers_orders(store):
+    store.add_order(make_order('order-1', date=200, company_name='Green Valley', customer_email='a@example.com'))
+    store.add_order(make_order('order-2', company_name='Green Hills', customer_email='b@example.com'))
+    store.add_order(make_order('order-3', date=100, company_name='Green Acres', customer_email='a@example.com'))
+    assert [o.order_id for o in store.search_orders('green', customer_email='a@example.com')] == ['order-3', 'order-1']
+    assert store.search_orders('green', customer_email='nobody@example.com') == []
+    assert store.search_orders('order-2', customer_email='a@example.com') == []
+
+
+def test_customer_search_follows_company_renames(store):
+    store.add_order(make_order('order-1', company_name='Green Valley', customer_email='a@example.com'))
+    store.update_order('order-1', 'SupportNotesUpdated', {'company_name': 'Blue River'})
+    assert store.search_orders('green', customer_email='a@example.com') == []
+    assert [o.order_id for o in store.search_orders('blue', customer_email='a@example.com')] == ['order-1']
+
+
+def test_add_order_rejects_duplicate_id(store):
+    store.add_order(make_order('order-1'))
+    with pytest.raises(KeyError):
+        store.add_order(make_order('order-1'))
+    assert store.count_orders() == 1
+
+
+def test_get_order_looks_up_by_id(store):
+    store.add_order(make_order('order-1'))
+    store.add_order(make_order('order-2'))
+    assert store.get_order('order-2').order_id == 'order-2'
+    assert store.get_order('missing') is None
+
+
+def test_status_buckets_follow_transitions(store):
+    for index in range(5):
+        store.add_order(make_order(f'order-{index}'))
+    store.update_orders([(f'order-{index}', 'ProductionApproved', None, None) for index in (1, 3)])
+    assert store.count_orders() == 5
+    assert store.count_orders(status='pending_payment_term') == 2
+    assert [o.order_id for o in store.list_orders(status='pending_production')] == ['order-0', 'order-2', 'order-4']
+    assert [o.order_id for o in store.list_orders(status='pending_payment_term')] == ['order-1', 'order-3']
+    assert store.list_orders(status='completed') == []
+    assert store.count_orders(status='completed') == 0
+
+
+def test_date_range_and_customer_queries(store):
+    store.add_order(make_order('order-1', date=100, customer_email='a@example.com'))
+    store.add_order(make_order('order-2', date=300, customer_email='b@example.com'))
+    store.add_order(make_order('order-3', date=200, customer_email='a@example.com'))
+    assert [o.order_id for o in store.list_orders_between(150, 400)] == ['order-3', 'order-2']
+    assert store.count_orders_between(customer_email='a@example.com') == 2
+    assert [o.order_id for o in store.list_orders_between(customer_email='a@example.com')] == ['order-1', 'order-3']
+    assert store.count_orders_between(customer_email='nobody@example.com') == 0
+
+
+def test_list_orders_returns_one_page(store):
+    for index in range(5):
+        store.add_order(make_order(f'order-{index}'))
+    assert [o.order_id for o in store.list_orders(offset=1, limit=2)] == ['order-1', 'order-2']
+    assert [o.order_id for o in store.list_orders(offset=4, limit=2)] == ['order-4']
+    assert [o.order_id for o in store.list_orders(status='pending_production', offset=3)] == ['order-3', 'order-4']
+
+
+def test_pending_do_count_follows_status(store):
+    store.add_order(make_order('order-1'))
+    for event, changes in (
+        ('ProductionApproved', None),
+        ('PaymentTermSelected', {'payment_term': 'Prepayment'}),
+        ('PaymentTermsApproved', None),
+        ('PaymentSubmitted', {'payment_amount': 250.0}),
+        ('PaymentVerified', None),
+        ('DOGenerated', {'do_number': 'DO-1'}),
+    ):
+        store.update_order('order-1', event, changes)
+    assert store.count_pending_do() == 1
+    store.update_order('order-1', 'ReadyForPickup')
+    assert store.count_pending_do() == 0
@@ -0,0 +1,45 @@
+import pytest
+
+from models import CartItem, Order
+from order_workflow import EVENTS, InvalidTransitionError, can_transition, get_transition, notifications_for
+
+
+def make_order(status='pending_production'):
+    return Order(
+        order_id='0123456789abcdef', date=0,
+        items=[CartItem('item-1', 'Tenera Palm', 10, 25.0, 250.0)], total=250.0,
+        company_name='Acme Plantations', contact_name='Jane', email='jane@acme.com',
+        phone='+6012-3456789', courier_company='FastCo', customer_email='jane@acme.com',
+        status=status
+    )
+
+
+def test_transition_moves_to_its_target():
+    transition = get_transition('pending_production', 'ProductionApproved')
+    assert transition.target == 'pending_payment_term'
+    assert can_transition('pending_production', 'ProductionRejected')
+
+
+def test_event_from_another_status_is_rejected():
+    assert not can_transition('completed', 'ProductionApproved')
+    with pytest.raises(InvalidTransitionError):
+        get_transition('completed', 'ProductionApproved')
+
+
+def test_unknown_event_is_rejected():
+    with pytest.raises(InvalidTransitionError):
+        get_transition('pending_production', 'StatusChanged')
+
+
+def test_events_without_sources_fire_from_any_status():
+    assert not EVENTS['SupportNotesUpdated'].sources
+    for status in ('pending_production', 'completed'):
+        assert get_transition(status, 'SupportNotesUpdated').target is None
+
+
+def test_notifications_are_addressed_by_recipient():
+    notifications = notifications_for('OrderSubmitted', make_order())
+    assert [n['recipient'] for n in notifications] == ['customer', 'production']
+    assert notifications[0]['user'] == 'jane@acme.com'
+    assert notifications[1]['user'] is None
+    assert '#01234567 ' in notifications[0]['message']
@@ -0,0 +1,36 @@
+from streamlit.testing.v1 import AppTest
+
+
+def paged_list(total):
+    import streamlit as st
+    from pagination import page_window
+
+    offset, limit = page_window('order_history', total, page_size=10)
+    st.write(f"window {offset} {limit}")
+
+
+def run(total, page=None):
+    at = AppTest.from_function(paged_list, args=(total,))
+    if page is not None:
+        at.session_state['order_history_page'] = page
+    return at.run()
+
+
+def test_single_page_shows_no_page_control():
+    at = run(5)
+    assert not at.number_input
+    assert at.markdown[0].value == 'window 0 10'
+    assert at.caption[0].value == 'Showing 1-5 of 5 (page 1 of 1)'
+
+
+def test_chosen_page_selects_its_window():
+    at = run(25)
+    at.number_input(key='order_history_page').set_value(3).run()
+    assert at.markdown[0].value == 'window 20 10'
+    assert at.caption[0].value == 'Showing 21-25 of 25 (page 3 of 3)'
+
+
+def test_page_past_the_end_moves_to_the_last_page():
+    at = run(15, page=4)
+    assert at.session_state['order_history_page'] == 2
+    assert at.markdown[0].value == 'window 10 10'